@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+自适应并发限制器（AIMD）
+上游请求的延迟和错误率正常时逐步提高并发上限（加性增），
+遇到限流响应、延迟突增或错误率升高时成倍降低并发上限（乘性减）；
+各上游接口（ajax / mobile / tv）的响应大小不同，延迟基线按接口分别统计；
+等待中的请求按优先级分道，交互请求优先获得额度，并预留一部分额度给交互请求
+"""
+import math
+import time
+import asyncio
+from collections import deque, defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+
+from download_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+
+
+class UpstreamCall:
+    """一次上游请求的结果，由调用方在请求过程中填写状态码"""
+
+    def __init__(self):
+        """初始化请求结果"""
+        self.status: Optional[int] = None
+
+
+class AdaptiveLimiter:
+    """自适应并发限制器"""
+
+    # 表示被限流的状态码
+    THROTTLE_STATUSES = (418, 429)
+
+    # 延迟超过同一接口平均延迟的该倍数视为延迟突增
+    LATENCY_SPIKE_FACTOR = 3.0
+
+    # 同一接口积累该数量的样本后才判断延迟突增，避免基线未稳定时误判
+    LATENCY_MIN_SAMPLES = 10
+
+    # 错误率（指数移动平均）超过该值时降低并发上限
+    ERROR_RATE_LIMIT = 0.2
+
+    # 指数移动平均的平滑系数
+    EWMA_ALPHA = 0.1
+
+    # 为交互请求预留的并发额度比例，低优先级请求不能占用这部分额度
+    INTERACTIVE_RESERVE = 0.25
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5
+    ):
+        """初始化自适应并发限制器
+
+        Args:
+            initial_limit: 初始并发上限
+            min_limit: 并发上限的最小值
+            max_limit: 并发上限的最大值
+            backoff: 降低并发上限时乘以的系数
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.limit = float(initial_limit)
+
+        self._in_flight = 0
+        # 优先级 -> 等待中的请求
+        self._waiters: Dict[int, deque] = defaultdict(deque)
+        # 优先级 -> 排队耗时、请求耗时统计
+        self._lanes: Dict[int, Dict[str, float]] = defaultdict(lambda: {
+            'requests': 0, 'wait': 0.0, 'max_wait': 0.0, 'latency': 0.0, 'max_latency': 0.0,
+        })
+        # 接口 -> 平均延迟（指数移动平均）、样本数
+        self._latency: Dict[str, float] = {}
+        self._samples: Dict[str, int] = defaultdict(int)
+        self._error_rate = 0.0
+        # 上次降低并发上限的时间，一个平均延迟内只降低一次，避免同一批请求重复惩罚
+        self._last_decrease = 0.0
+
+        self._completed = 0
+        self._throttled = 0
+        self._errors = 0
+        self._decreases = 0
+
+    def _capacity(self, priority: int) -> int:
+        """获取某优先级可以使用的并发额度
+
+        Args:
+            priority: 优先级
+
+        Returns:
+            并发额度，低优先级请求不能使用为交互请求预留的额度
+        """
+        limit = int(self.limit)
+        if priority <= PRIORITY_INTERACTIVE or limit <= 1:
+            return limit
+        return limit - max(1, math.ceil(limit * self.INTERACTIVE_RESERVE))
+
+    def _wake(self):
+        """在并发上限内按优先级唤醒等待中的请求"""
+        for priority in sorted(self._waiters):
+            waiters = self._waiters[priority]
+            while waiters and self._in_flight < self._capacity(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._in_flight += 1
+                    waiter.set_result(None)
+            if not waiters:
+                del self._waiters[priority]
+            if self._in_flight >= int(self.limit):
+                return
+
+    async def _acquire(self, priority: int):
+        """等待并发额度
+
+        Args:
+            priority: 优先级
+        """
+        queued = any(waiters for lane, waiters in self._waiters.items() if lane <= priority)
+        if not queued and self._in_flight < self._capacity(priority):
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 已获得额度但未开始请求，归还额度
+                self._in_flight -= 1
+                self._wake()
+            raise
+
+    def _decrease(self, now: float, endpoint: str):
+        """乘性减：降低并发上限
+
+        Args:
+            now: 当前时间（time.monotonic()）
+            endpoint: 触发降低的上游接口
+        """
+        if now - self._last_decrease < self._latency.get(endpoint, 0.0):
+            return
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self._last_decrease = now
+        self._decreases += 1
+
+    def _record(self, endpoint: str, latency: float, status: Optional[int], failed: bool):
+        """根据请求结果调整并发上限
+
+        Args:
+            endpoint: 上游接口
+            latency: 请求耗时（秒）
+            status: 响应状态码
+            failed: 请求是否抛出异常
+        """
+        now = time.monotonic()
+        self._completed += 1
+        throttled = status in self.THROTTLE_STATUSES
+        error = failed or (status is not None and status >= 500)
+        if throttled:
+            self._throttled += 1
+        if error:
+            self._errors += 1
+        self._error_rate += self.EWMA_ALPHA * ((1.0 if error else 0.0) - self._error_rate)
+
+        baseline = self._latency.get(endpoint)
+        spike = (
+            self._samples[endpoint] >= self.LATENCY_MIN_SAMPLES
+            and latency > baseline * self.LATENCY_SPIKE_FACTOR
+        )
+        self._samples[endpoint] += 1
+        if baseline is None:
+            self._latency[endpoint] = latency
+        else:
+            self._latency[endpoint] = baseline + self.EWMA_ALPHA * (latency - baseline)
+
+        if throttled or spike or self._error_rate > self.ERROR_RATE_LIMIT:
+            self._decrease(now, endpoint)
+        elif not error:
+            # 加性增：每完成一轮（约 limit 个请求）并发上限加1
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _record_lane(self, priority: int, wait: float, latency: float):
+        """记录某优先级请求的排队耗时和请求耗时
+
+        Args:
+            priority: 优先级
+            wait: 排队耗时（秒）
+            latency: 请求耗时（秒）
+        """
+        lane = self._lanes[priority]
+        lane['requests'] += 1
+        lane['wait'] += wait
+        lane['max_wait'] = max(lane['max_wait'], wait)
+        lane['latency'] += latency
+        lane['max_latency'] = max(lane['max_latency'], latency)
+
+    @asynccontextmanager
+    async def request(
+        self,
+        priority: int = PRIORITY_BACKFILL,
+        endpoint: str = 'default'
+    ) -> AsyncIterator[UpstreamCall]:
+        """在并发额度内执行一次上游请求
+
+        用法::
+
+            async with limiter.request(PRIORITY_INTERACTIVE, 'ajax') as call:
+                async with session.get(url) as response:
+                    call.status = response.status
+
+        Args:
+            priority: 优先级，PRIORITY_INTERACTIVE 优先于 PRIORITY_BACKFILL
+            endpoint: 上游接口名称，延迟突增按同一接口的平均延迟判断
+
+        Yields:
+            请求结果，调用方填写 status 后用于调整并发上限
+        """
+        queued_at = time.monotonic()
+        await self._acquire(priority)
+        call = UpstreamCall()
+        start = time.monotonic()
+        # 被取消的请求不反映上游状况，不参与调整
+        record = True
+        failed = False
+        try:
+            yield call
+        except asyncio.CancelledError:
+            record = False
+            raise
+        except Exception:
+            # 收到响应之后抛出的异常（如未找到媒体文件）不算上游错误
+            failed = call.status is None
+            raise
+        finally:
+            self._in_flight -= 1
+            end = time.monotonic()
+            self._record_lane(priority, start - queued_at, end - start)
+            if record:
+                self._record(endpoint, end - start, call.status, failed)
+            self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取限制器统计信息
+
+        Returns:
+            统计字典，包含:
+            - limit: 当前并发上限
+            - in_flight: 进行中的请求数
+            - waiting: 各优先级等待中的请求数
+            - latency: 各接口的平均延迟（秒，指数移动平均）
+            - error_rate: 错误率（指数移动平均）
+            - completed / throttled / errors: 已完成 / 被限流 / 出错的请求数
+            - decreases: 并发上限被降低的次数
+            - lanes: 各优先级的 requests（请求数）、avg_wait / max_wait（排队耗时，秒）、
+              avg_latency / max_latency（请求耗时，秒）
+        """
+        return {
+            'limit': int(self.limit),
+            'in_flight': self._in_flight,
+            'waiting': {priority: len(waiters) for priority, waiters in self._waiters.items()},
+            'latency': dict(self._latency),
+            'error_rate': self._error_rate,
+            'completed': self._completed,
+            'throttled': self._throttled,
+            'errors': self._errors,
+            'decreases': self._decreases,
+            'lanes': {
+                priority: {
+                    'requests': int(lane['requests']),
+                    'avg_wait': lane['wait'] / lane['requests'],
+                    'max_wait': lane['max_wait'],
+                    'avg_latency': lane['latency'] / lane['requests'],
+                    'max_latency': lane['max_latency'],
+                }
+                for priority, lane in self._lanes.items()
+            },
+        }
@@ -3,8 +3,10 @@
 基础解析器抽象类
 只负责将url解析为元数据表
 """
+import importlib
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Type
+from urllib.parse import urlparse
 
 import aiohttp
 
@@ -12,6 +14,9 @@ import aiohttp
 class BaseVideoParser(ABC):
     """视频解析器基类，只负责解析URL返回元数据"""
 
+    # 解析器负责的域名（子域名会逐级回退匹配），供 ParserRegistry 分发使用
+    HOSTS: Tuple[str, ...] = ()
+
     def __init__(self, name: str):
         """初始化视频解析器基类
 
@@ -71,3 +76,112 @@ class BaseVideoParser(ABC):
             解析失败时直接raise异常，不记录日志
         """
         pass
+
+
+class ParserRegistry:
+    """解析器注册表，按域名索引解析器，实现 O(1) 分发
+
+    解析器通过 HOSTS 声明自己负责的域名；注册时可只提供模块路径，
+    首次命中该域名时才导入模块并实例化解析器，避免拖慢进程启动。
+    """
+
+    def __init__(self):
+        """初始化解析器注册表"""
+        # 域名 -> (模块名, 类名)
+        self._host_specs: Dict[str, Tuple[str, str]] = {}
+        # (模块名, 类名) -> 解析器实例
+        self._instances: Dict[Tuple[str, str], BaseVideoParser] = {}
+
+    def register(self, parser_cls: Type[BaseVideoParser]) -> Type[BaseVideoParser]:
+        """注册已导入的解析器类，可用作类装饰器
+
+        Args:
+            parser_cls: 解析器类，需声明 HOSTS
+
+        Returns:
+            原解析器类
+        """
+        self.register_lazy(parser_cls.__module__, parser_cls.__name__, parser_cls.HOSTS)
+        return parser_cls
+
+    def register_lazy(self, module_name: str, class_name: str, hosts: Iterable[str]):
+        """按模块路径注册解析器，首次使用时才导入
+
+        Args:
+            module_name: 解析器所在模块名
+            class_name: 解析器类名
+            hosts: 解析器负责的域名列表
+        """
+        spec = (module_name, class_name)
+        for host in hosts:
+            self._host_specs[host.lower()] = spec
+
+    @staticmethod
+    def _get_hostname(url: str) -> str:
+        """从URL中提取小写域名，兼容不带协议的链接
+
+        Args:
+            url: 链接
+
+        Returns:
+            域名，无法解析时返回空字符串
+        """
+        if '//' not in url:
+            url = '//' + url
+        return (urlparse(url).hostname or '').lower()
+
+    def _lookup_spec(self, hostname: str) -> Optional[Tuple[str, str]]:
+        """按域名查找解析器，逐级去掉子域名（如 www.weibo.com -> weibo.com）
+
+        Args:
+            hostname: 域名
+
+        Returns:
+            (模块名, 类名)，未注册时返回None
+        """
+        while hostname:
+            spec = self._host_specs.get(hostname)
+            if spec:
+                return spec
+            _, _, hostname = hostname.partition('.')
+        return None
+
+    def _get_instance(self, spec: Tuple[str, str]) -> BaseVideoParser:
+        """获取（必要时导入并创建）解析器实例
+
+        Args:
+            spec: (模块名, 类名)
+
+        Returns:
+            解析器实例
+        """
+        parser = self._instances.get(spec)
+        if parser is None:
+            module_name, class_name = spec
+            module = importlib.import_module(module_name)
+            parser = getattr(module, class_name)()
+            self._instances[spec] = parser
+        return parser
+
+    def get_parser(self, url: str) -> Optional[BaseVideoParser]:
+        """根据URL域名分发到对应解析器，只调用该解析器的 can_parse
+
+        Args:
+            url: 链接
+
+        Returns:
+            可以解析此URL的解析器，不存在时返回None
+        """
+        spec = self._lookup_spec(self._get_hostname(url))
+        if spec is None:
+            return None
+        parser = self._get_instance(spec)
+        return parser if parser.can_parse(url) else None
+
+
+# 微博解析器负责的域名（WeiboParser.HOSTS 引用此处，注册时无需导入解析器模块）
+WEIBO_HOSTS = ('weibo.com', 'weibo.cn', 'm.weibo.cn', 'video.weibo.com', 't.cn', 'sinaurl.cn')
+
+# 默认注册表，内置解析器以模块路径注册，首次使用时才导入
+registry = ParserRegistry()
+registry.register_lazy('weibo_parser', 'WeiboParser', WEIBO_HOSTS)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+离线解析基准测试
+使用仓库中保存的 m.weibo.cn / video.weibo.com 响应样本模拟上游接口，
+分别在 asyncio 默认事件循环和 uvloop 下运行并发解析，输出每秒解析次数和事件循环延迟
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from http.cookies import SimpleCookie
+from typing import Optional, Dict, Any
+
+from runner import run, install_uvloop, LoopLagMonitor
+from weibo_parser import WeiboParser
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 基准测试使用的链接（响应来自仓库中的样本文件）
+BENCH_URLS = [
+    'https://m.weibo.cn/detail/5232446897127970',
+    'https://video.weibo.com/show?fid=1034:5232446897127970',
+]
+
+
+class _OfflineResponse:
+    """离线响应，接口与 aiohttp.ClientResponse 中解析器用到的部分一致"""
+
+    def __init__(self, status: int, body: str, cookies: Optional[SimpleCookie] = None):
+        self.status = status
+        self.body = body
+        self.cookies = cookies or SimpleCookie()
+        self.headers: Dict[str, str] = {}
+
+    async def __aenter__(self) -> '_OfflineResponse':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def text(self) -> str:
+        return self.body
+
+    async def read(self) -> bytes:
+        return self.body.encode('utf-8')
+
+    async def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _OfflineSession:
+    """离线会话，按URL返回样本响应"""
+
+    def __init__(self):
+        with open(os.path.join(ROOT, 'm.weibo.cn', 'image_response.txt'), encoding='utf-8') as f:
+            self.detail_html = f.read()
+        with open(os.path.join(ROOT, 'video.weibo.com', 'response.txt'), encoding='utf-8') as f:
+            self.video_json = f.read()
+
+    def _respond(self, url: str) -> _OfflineResponse:
+        if 'genvisitor2' in url:
+            cookies = SimpleCookie()
+            cookies['SUB'] = 'bench'
+            cookies['SUBP'] = 'bench'
+            return _OfflineResponse(200, '', cookies)
+        if 'm.weibo.cn/detail' in url:
+            return _OfflineResponse(200, self.detail_html)
+        if 'tv/api/component' in url:
+            return _OfflineResponse(200, self.video_json)
+        return _OfflineResponse(404, '')
+
+    def get(self, url: str, **kwargs) -> _OfflineResponse:
+        return self._respond(url)
+
+    def post(self, url: str, **kwargs) -> _OfflineResponse:
+        return self._respond(url)
+
+
+async def bench(count: int, concurrency: int) -> Dict[str, Any]:
+    """并发解析 count 次并统计耗时
+
+    Args:
+        count: 解析次数
+        concurrency: 并发数
+
+    Returns:
+        统计字典，包含 parses_per_sec 和事件循环延迟
+    """
+    parser = WeiboParser()
+    session = _OfflineSession()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def parse_one(index: int):
+        async with semaphore:
+            await parser.parse(session, BENCH_URLS[index % len(BENCH_URLS)])
+
+    async with LoopLagMonitor(interval=0.01) as monitor:
+        start = time.perf_counter()
+        await asyncio.gather(*(parse_one(index) for index in range(count)))
+        elapsed = time.perf_counter() - start
+    return dict(monitor.stats(), parses_per_sec=count / elapsed)
+
+
+def main():
+    """主函数"""
+    arg_parser = argparse.ArgumentParser(description='离线解析基准测试')
+    arg_parser.add_argument('--count', type=int, default=2000, help='解析次数')
+    arg_parser.add_argument('--concurrency', type=int, default=64, help='并发数')
+    args = arg_parser.parse_args()
+
+    # asyncio 默认事件循环必须先运行，install_uvloop() 会替换全局事件循环策略
+    modes = [('asyncio', False)]
+    if install_uvloop():
+        modes.append(('uvloop', True))
+    else:
+        print("未安装 uvloop，只测试 asyncio 默认事件循环（pip install uvloop）")
+    asyncio.set_event_loop_policy(None)
+
+    for name, use_uvloop in modes:
+        stats = run(bench(args.count, args.concurrency), use_uvloop=use_uvloop)
+        print(
+            f"{name:8s} {stats['parses_per_sec']:9.1f} parses/sec  "
+            f"loop lag avg {stats['avg_lag'] * 1000:.2f}ms max {stats['max_lag'] * 1000:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
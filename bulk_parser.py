@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+批量解析器
+将链接流按规范化微博ID分片到多个工作进程，每个进程拥有独立的事件循环、会话和cookie，
+解析结果以流式方式合并返回，用于大规模回填时利用多核
+"""
+import os
+import asyncio
+import threading
+import zlib
+import multiprocessing
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Iterable, Iterator
+
+import aiohttp
+
+from runner import run
+from weibo_parser import WeiboParser
+from visitor_pool import VisitorPool
+
+
+# 进程间队列的结束标记
+_SENTINEL = None
+
+
+def _shard_of(post_id: str, workers: int) -> int:
+    """计算微博ID所属的分片（跨进程稳定，不受 PYTHONHASHSEED 影响）
+
+    Args:
+        post_id: 规范化微博ID
+        workers: 工作进程数
+
+    Returns:
+        分片序号
+    """
+    return zlib.crc32(post_id.encode('utf-8')) % workers
+
+
+async def _worker_loop(
+    in_queue: multiprocessing.Queue,
+    out_queue: multiprocessing.Queue,
+    concurrency: int,
+    fields: Optional[List[str]],
+    identities: int = 1,
+    cache_size: int = 256
+):
+    """工作进程内的事件循环：从输入队列取链接并发解析，结果写入输出队列
+
+    同一条微博一定落在同一个分片，因此进程内按微博ID缓存最近的结果即可避免重复请求
+
+    Args:
+        in_queue: 输入队列，元素为 (url, post_id)
+        out_queue: 输出队列
+        concurrency: 进程内并发解析数
+        fields: 需要返回的字段，透传给 parse()
+        identities: 进程内使用的访客身份数
+        cache_size: 按微博ID缓存的解析任务数，超出时淘汰最久未使用的
+    """
+    parser = WeiboParser(visitor_pool=VisitorPool.create(identities))
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    # 微博ID -> 解析任务，重复链接复用同一个任务的结果；
+    # 只保留最近 cache_size 个，内存占用不随输入规模增长（被淘汰的进行中任务仍由等待者持有）
+    parse_tasks: OrderedDict = OrderedDict()
+    tasks = set()
+
+    async def fetch(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await parser.parse(session, url, fields=fields)
+
+    async def parse_one(session: aiohttp.ClientSession, url: str, post_id: str):
+        parse_task = parse_tasks.get(post_id)
+        if parse_task is None:
+            parse_task = asyncio.ensure_future(fetch(session, url))
+            parse_tasks[post_id] = parse_task
+            while len(parse_tasks) > cache_size:
+                parse_tasks.popitem(last=False)
+        else:
+            parse_tasks.move_to_end(post_id)
+        try:
+            result = dict(await asyncio.shield(parse_task), url=url)
+        except Exception as e:
+            result = {'url': url, 'error': str(e)}
+        out_queue.put(result)
+
+    async with aiohttp.ClientSession() as session:
+        while True:
+            item = await loop.run_in_executor(None, in_queue.get)
+            if item is _SENTINEL:
+                break
+            url, post_id = item
+            task = asyncio.create_task(parse_one(session, url, post_id))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            # 输入队列有界，控制进程内积压的任务数量
+            while len(tasks) >= concurrency * 2:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+def _worker_main(
+    in_queue: multiprocessing.Queue,
+    out_queue: multiprocessing.Queue,
+    concurrency: int,
+    fields: Optional[List[str]],
+    identities: int = 1,
+    cache_size: int = 256
+):
+    """工作进程入口
+
+    Args:
+        in_queue: 输入队列
+        out_queue: 输出队列
+        concurrency: 进程内并发解析数
+        fields: 需要返回的字段
+        identities: 进程内使用的访客身份数
+        cache_size: 按微博ID缓存的解析任务数
+    """
+    try:
+        run(_worker_loop(in_queue, out_queue, concurrency, fields, identities, cache_size))
+    finally:
+        out_queue.put(_SENTINEL)
+
+
+def _feed(
+    urls: Iterable[str],
+    in_queues: List[multiprocessing.Queue],
+    parser: WeiboParser
+):
+    """将链接流按微博ID分发到各工作进程的输入队列（在后台线程中运行）
+
+    Args:
+        urls: 链接流
+        in_queues: 各工作进程的输入队列
+        parser: 用于计算规范化ID的解析器
+    """
+    try:
+        for url in urls:
+            try:
+                post_id = parser.get_post_id(url)
+            except ValueError:
+                # 无法识别的链接照常分发，由工作进程解析时返回错误结果
+                post_id = url
+            in_queues[_shard_of(post_id, len(in_queues))].put((url, post_id))
+    finally:
+        for in_queue in in_queues:
+            in_queue.put(_SENTINEL)
+
+
+def parse_bulk(
+    urls: Iterable[str],
+    workers: Optional[int] = None,
+    concurrency: int = 4,
+    queue_size: int = 256,
+    fields: Optional[Iterable[str]] = None,
+    identities: int = 1
+) -> Iterator[Dict[str, Any]]:
+    """多进程批量解析微博链接，按完成顺序流式返回结果
+
+    Args:
+        urls: 链接流（可以是生成器或文件对象，按需读取），
+            例如 WeiboParser().iter_links(f) 从聊天记录等大文件中流式提取链接
+        workers: 工作进程数，默认为CPU核数
+        concurrency: 每个进程内的并发解析数
+        queue_size: 每个进程输入队列的容量，同时作为进程内按微博ID缓存的解析结果数，用于限制内存占用
+        fields: 需要返回的字段子集，同 WeiboParser.parse()
+        identities: 每个进程内使用的访客身份数，请求在身份间轮换以分散限流
+
+    Yields:
+        与 WeiboParser.parse() 相同结构的结果字典；
+        解析失败的链接返回 {'url': url, 'error': 错误信息}
+    """
+    workers = workers or os.cpu_count() or 1
+    fields = list(fields) if fields is not None else None
+    ctx = multiprocessing.get_context()
+    in_queues = [ctx.Queue(maxsize=queue_size) for _ in range(workers)]
+    out_queue = ctx.Queue()
+
+    processes = [
+        ctx.Process(target=_worker_main, args=(in_queue, out_queue, concurrency, fields, identities, queue_size), daemon=True)
+        for in_queue in in_queues
+    ]
+    for process in processes:
+        process.start()
+
+    feeder = threading.Thread(
+        target=_feed,
+        args=((url.strip() for url in urls if url.strip()), in_queues, WeiboParser()),
+        daemon=True
+    )
+    feeder.start()
+
+    try:
+        finished = 0
+        while finished < workers:
+            result = out_queue.get()
+            if result is _SENTINEL:
+                finished += 1
+                continue
+            yield result
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
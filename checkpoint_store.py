@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+时间线检查点存储
+以 JSON 文件保存每个用户已同步的最新微博ID，供增量同步使用；
+被 max_pages 截断的同步另外保存续传游标，下次从停下的位置继续往旧翻页
+"""
+import os
+import json
+import logging
+import threading
+from typing import Optional, Dict, Any
+
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineCheckpointStore:
+    """时间线检查点存储，记录每个用户已同步的最新微博ID和未完成同步的续传游标
+
+    文件格式为 {用户ID: 检查点}，检查点是已同步的最新微博ID；
+    存在未完成的同步时为 {'since_id': 已同步的最新微博ID或null, 'cursor': 续传游标}
+    """
+
+    def __init__(self, path: str):
+        """初始化检查点存储，文件存在时加载已有检查点
+
+        Args:
+            path: 检查点文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # 用户ID -> 已同步的最新微博ID
+        self._checkpoints: Dict[str, int] = {}
+        # 用户ID -> 未完成同步的续传游标
+        self._cursors: Dict[str, Dict[str, int]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._load(json.load(f))
+            except (OSError, ValueError, TypeError, AttributeError, KeyError) as e:
+                # 文件损坏时从头同步，下次写入时覆盖
+                logger.warning("检查点文件损坏，已忽略: %s (%s)", path, e)
+                self._checkpoints = {}
+                self._cursors = {}
+
+    def _load(self, data: Dict[str, Any]):
+        """加载检查点文件内容
+
+        Args:
+            data: 检查点文件中的 JSON 对象
+        """
+        for uid, checkpoint in data.items():
+            if not isinstance(checkpoint, dict):
+                self._checkpoints[uid] = int(checkpoint)
+                continue
+            if checkpoint.get('since_id') is not None:
+                self._checkpoints[uid] = int(checkpoint['since_id'])
+            cursor = checkpoint.get('cursor')
+            if cursor:
+                self._cursors[uid] = {key: int(cursor[key]) for key in ('pending_id', 'max_id', 'page')}
+
+    def get(self, uid: str) -> Optional[int]:
+        """获取用户的检查点
+
+        Args:
+            uid: 用户ID
+
+        Returns:
+            已同步的最新微博ID，从未同步时返回None
+        """
+        return self._checkpoints.get(str(uid))
+
+    def get_cursor(self, uid: str) -> Optional[Dict[str, int]]:
+        """获取用户未完成同步的续传游标
+
+        Args:
+            uid: 用户ID
+
+        Returns:
+            续传游标，包含 pending_id（该次同步见到的最新微博ID，同步完成后成为检查点）、
+            max_id（已产出的最旧微博ID，续传时只产出更旧的微博）、page（下一次请求的页码）；
+            没有未完成的同步时返回None
+        """
+        cursor = self._cursors.get(str(uid))
+        return dict(cursor) if cursor else None
+
+    def set(self, uid: str, since_id: int):
+        """更新用户的检查点并立即写入文件，同时清除续传游标
+
+        Args:
+            uid: 用户ID
+            since_id: 已同步的最新微博ID
+        """
+        with self._lock:
+            self._checkpoints[str(uid)] = int(since_id)
+            self._cursors.pop(str(uid), None)
+            self._save()
+
+    def set_cursor(self, uid: str, pending_id: int, max_id: int, page: int):
+        """保存被截断的同步的续传游标并立即写入文件，检查点保持不变
+
+        Args:
+            uid: 用户ID
+            pending_id: 该次同步见到的最新微博ID
+            max_id: 已产出的最旧微博ID
+            page: 下一次请求的页码
+        """
+        with self._lock:
+            self._cursors[str(uid)] = {'pending_id': int(pending_id), 'max_id': int(max_id), 'page': int(page)}
+            self._save()
+
+    def _save(self):
+        """原子地写入检查点文件（先写临时文件再替换，避免中断时损坏）"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        data: Dict[str, Any] = dict(self._checkpoints)
+        for uid, cursor in self._cursors.items():
+            data[uid] = {'since_id': self._checkpoints.get(uid), 'cursor': cursor}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+上游接口熔断器
+每个上游接口（passport / ajax / mobile / tv）一个熔断器：连续失败达到阈值后打开，
+打开期间的请求立即失败，不再等待超时；冷却时间过后进入半开状态，放行少量探测请求，
+探测成功则关闭，失败则重新打开
+"""
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+
+import aiohttp
+
+from weibo_errors import WeiboError, StageTimeoutError, CircuitOpenError
+
+
+# 熔断器状态
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """单个上游接口的熔断器"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max: int = 1
+    ):
+        """初始化熔断器
+
+        Args:
+            name: 上游接口名称
+            failure_threshold: 连续失败多少次后打开
+            reset_timeout: 打开后经过多久（秒）进入半开状态
+            half_open_max: 半开状态下同时放行的探测请求数
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态（closed / open / half_open），打开超过 reset_timeout 后视为半开"""
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = STATE_HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    @staticmethod
+    def is_failure(error: BaseException) -> Optional[bool]:
+        """判断异常是否说明上游接口不可用
+
+        Args:
+            error: 请求过程中抛出的异常
+
+        Returns:
+            超时、连接错误和 5xx 返回True；收到了正常响应的异常（404、限流、没有媒体等）返回False；
+            与上游无关的异常（在并发限制器中排队超时）返回None，不计入统计
+        """
+        if isinstance(error, StageTimeoutError):
+            return None if error.stage == 'queue' else True
+        if isinstance(error, WeiboError):
+            return error.status is not None and error.status >= 500
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return True
+        return False
+
+    def _allow(self):
+        """检查是否放行请求
+
+        Raises:
+            CircuitOpenError: 熔断器打开，或半开状态下探测请求已满
+        """
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_HALF_OPEN and self._probes < self.half_open_max:
+            self._probes += 1
+            return
+        self._rejected += 1
+        retry_after = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _open(self):
+        """打开熔断器"""
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._opened += 1
+
+    def _record(self, failed: bool, probe: bool):
+        """记录请求结果
+
+        Args:
+            failed: 请求是否失败
+            probe: 是否为半开状态下放行的探测请求
+        """
+        if probe:
+            self._probes = max(0, self._probes - 1)
+            if self._state != STATE_HALF_OPEN:
+                return
+            if failed:
+                self._open()
+            else:
+                self._state = STATE_CLOSED
+                self._failures = 0
+            return
+
+        if self._state != STATE_CLOSED:
+            # 打开前发出、打开后才返回的请求不影响状态
+            return
+        if not failed:
+            self._failures = 0
+            return
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open()
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[None]:
+        """在熔断器保护下执行一次上游请求，请求中抛出的异常按 is_failure 计入统计
+
+        用法::
+
+            async with breaker.request():
+                async with session.get(url) as response:
+                    ...
+
+        Raises:
+            CircuitOpenError: 熔断器打开，请求未发出
+        """
+        self._allow()
+        probe = self._state == STATE_HALF_OPEN
+        try:
+            yield
+        except asyncio.CancelledError:
+            if probe:
+                # 被取消的探测请求不反映上游状况，让出探测名额
+                self._probes = max(0, self._probes - 1)
+            raise
+        except Exception as e:
+            failed = self.is_failure(e)
+            if failed is not None:
+                self._record(failed, probe)
+            elif probe:
+                self._probes = max(0, self._probes - 1)
+            raise
+        else:
+            self._record(False, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取熔断器统计信息
+
+        Returns:
+            统计字典，包含:
+            - state: 当前状态（closed / open / half_open）
+            - failures: 连续失败次数
+            - opened: 累计打开次数
+            - rejected: 打开期间被直接拒绝的请求数
+            - retry_after: 距离进入半开状态的秒数（未打开时为0）
+        """
+        state = self.state
+        retry_after = 0.0
+        if state == STATE_OPEN:
+            retry_after = max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+        return {
+            'state': state,
+            'failures': self._failures,
+            'opened': self._opened,
+            'rejected': self._rejected,
+            'retry_after': retry_after,
+        }
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+调用时间预算
+parse() 的超时时间作为整体预算，依次分配给短链接解析、排队、访客cookie获取、XSRF-TOKEN获取、
+上游请求和响应体读取等阶段：每个阶段只能使用剩余的预算，预算耗尽时取消该阶段并抛出
+StageTimeoutError 指明超时的阶段
+"""
+import time
+import asyncio
+from contextvars import ContextVar
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Any, Awaitable, AsyncIterator, Iterator
+
+from weibo_errors import StageTimeoutError
+
+
+class Deadline:
+    """一次调用的截止时间"""
+
+    def __init__(self, timeout: float):
+        """初始化截止时间
+
+        Args:
+            timeout: 时间预算（秒）
+        """
+        self.timeout = timeout
+        self.expires = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """获取剩余的时间预算
+
+        Returns:
+            剩余秒数，已超时返回0
+        """
+        return max(self.expires - time.monotonic(), 0.0)
+
+
+# 当前任务的截止时间，parse() 设置后各阶段无需逐层传参
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """获取当前任务的截止时间
+
+    Returns:
+        截止时间，不限时为None
+    """
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """在作用域内为当前任务设置时间预算
+
+    Args:
+        timeout: 时间预算（秒），None 表示不限时
+
+    Yields:
+        截止时间，不限时为None
+    """
+    deadline = Deadline(timeout) if timeout is not None else None
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+async def run_stage(stage: str, awaitable: Awaitable) -> Any:
+    """在剩余的时间预算内执行一个阶段
+
+    Args:
+        stage: 阶段名称
+        awaitable: 该阶段的协程
+
+    Returns:
+        协程的返回值
+
+    Raises:
+        StageTimeoutError: 时间预算耗尽
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        if deadline.remaining() > 0:
+            # 阶段内部自身的超时（例如 aiohttp 的超时设置），不是预算耗尽
+            raise
+        raise StageTimeoutError(stage, deadline.timeout) from None
+
+
+@asynccontextmanager
+async def stage_context(stage: str, context_manager: Any) -> AsyncIterator[Any]:
+    """在剩余的时间预算内进入异步上下文（例如等待 session.get() 返回响应头）
+
+    Args:
+        stage: 阶段名称
+        context_manager: 异步上下文管理器
+
+    Yields:
+        上下文管理器 __aenter__ 的返回值
+
+    Raises:
+        StageTimeoutError: 时间预算耗尽
+    """
+    value = await run_stage(stage, context_manager.__aenter__())
+    try:
+        yield value
+    except BaseException as e:
+        if not await context_manager.__aexit__(type(e), e, e.__traceback__):
+            raise
+    else:
+        await context_manager.__aexit__(None, None, None)
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+"""
+分布式解析工作节点
+多个节点从同一个队列后端（兼容 Redis 的 lpush / brpop / get / set / delete 接口）拉取链接，
+解析结果、失败结果和访客cookie都通过后端共享，并按微博ID加锁，同一条微博只由一个节点请求上游
+"""
+import json
+import time
+import uuid
+import asyncio
+from collections import deque, defaultdict
+from typing import Optional, Dict, Any, List, Iterable, Tuple, Union
+
+import aiohttp
+
+from weibo_parser import WeiboParser
+from retry_policy import RetryPolicy
+from weibo_errors import WeiboError
+
+
+# 释放微博锁：只有锁的值仍是自己的令牌时才删除（在后端原子执行，避免删除其他节点刚获取的锁）
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class MemoryBackend:
+    """内存队列后端，实现工作节点用到的 Redis 命令子集，用于测试和单机运行
+
+    生产环境传入 redis.asyncio.Redis 实例即可（pip install redis），需要支持 EVAL
+    """
+
+    def __init__(self):
+        """初始化内存后端"""
+        self._values: Dict[str, str] = {}
+        # 键 -> 过期时间（time.monotonic()）
+        self._expires: Dict[str, float] = {}
+        self._lists: Dict[str, deque] = defaultdict(deque)
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        """获取列表变化的通知条件（在事件循环中首次使用时创建）
+
+        Returns:
+            asyncio.Condition
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _expire(self, key: str):
+        """删除已过期的键
+
+        Args:
+            key: 键
+        """
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+
+    async def get(self, key: str) -> Optional[str]:
+        """GET 命令"""
+        self._expire(key)
+        return self._values.get(key)
+
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ex: Optional[float] = None,
+        px: Optional[float] = None,
+        nx: bool = False
+    ) -> Optional[bool]:
+        """SET 命令，支持 EX / PX / NX 选项
+
+        Returns:
+            设置成功返回True，NX 且键已存在时返回None
+        """
+        self._expire(key)
+        if nx and key in self._values:
+            return None
+        self._values[key] = value
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        elif px is not None:
+            self._expires[key] = time.monotonic() + px / 1000
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        """DEL 命令
+
+        Returns:
+            删除的键数量
+        """
+        deleted = 0
+        for key in keys:
+            self._expire(key)
+            if self._values.pop(key, None) is not None:
+                deleted += 1
+            self._expires.pop(key, None)
+        return deleted
+
+    async def lpush(self, key: str, *values: str) -> int:
+        """LPUSH 命令
+
+        Returns:
+            列表长度
+        """
+        condition = self._get_condition()
+        async with condition:
+            self._lists[key].extendleft(values)
+            condition.notify_all()
+        return len(self._lists[key])
+
+    async def brpop(self, keys: Union[str, List[str]], timeout: float = 0) -> Optional[Tuple[str, str]]:
+        """BRPOP 命令
+
+        Args:
+            keys: 列表键
+            timeout: 最长等待时间（秒），0 表示一直等待
+
+        Returns:
+            (键, 值)，超时返回None
+        """
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        deadline = time.monotonic() + timeout if timeout else None
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                for key in keys:
+                    if self._lists[key]:
+                        return key, self._lists[key].pop()
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: str) -> int:
+        """EVAL 命令，只支持 RELEASE_LOCK_SCRIPT（内存后端在事件循环中执行，天然是原子的）
+
+        Returns:
+            删除的键数量
+
+        Raises:
+            NotImplementedError: 其他脚本
+        """
+        if script != RELEASE_LOCK_SCRIPT or numkeys != 1:
+            raise NotImplementedError("MemoryBackend 只支持 RELEASE_LOCK_SCRIPT")
+        key, token = keys_and_args
+        self._expire(key)
+        if self._values.get(key) == token:
+            return await self.delete(key)
+        return 0
+
+
+def _decode(value: Any) -> Optional[str]:
+    """将后端返回值统一为字符串（redis 客户端默认返回 bytes）
+
+    Args:
+        value: 后端返回值
+
+    Returns:
+        字符串，值不存在时返回None
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+class DistributedWorker:
+    """分布式解析工作节点"""
+
+    # 等待其他节点解析同一条微博时的轮询间隔（秒）
+    LOCK_POLL_INTERVAL = 0.2
+
+    # 默认解析时间预算占锁有效期的比例，留出写入结果和释放锁的时间
+    PARSE_TIMEOUT_RATIO = 0.8
+
+    def __init__(
+        self,
+        backend: Any,
+        parser: Optional[WeiboParser] = None,
+        namespace: str = 'weibo',
+        result_ttl: int = 24 * 3600,
+        negative_ttl: int = 300,
+        lock_ttl: int = 60,
+        parse_timeout: Optional[float] = None
+    ):
+        """初始化工作节点
+
+        Args:
+            backend: 队列后端，MemoryBackend 或 redis.asyncio.Redis 实例
+            parser: 微博解析器，默认新建
+            namespace: 后端键前缀，同一集群的节点使用相同的前缀
+            result_ttl: 解析结果的缓存时间（秒）
+            negative_ttl: 永久性失败（微博不存在、没有媒体等）的缓存时间（秒），期间其他节点不再请求同一条微博
+            lock_ttl: 微博锁的有效期（秒），持有锁的节点异常退出后由其他节点接手
+            parse_timeout: 单次解析（含重试）的时间预算（秒），必须小于 lock_ttl，
+                保证解析结束前锁不会过期而被其他节点接手；默认为 lock_ttl 的 80%
+
+        Raises:
+            ValueError: parse_timeout 不小于 lock_ttl
+        """
+        if parse_timeout is None:
+            parse_timeout = lock_ttl * self.PARSE_TIMEOUT_RATIO
+        if parse_timeout >= lock_ttl:
+            raise ValueError(f"parse_timeout ({parse_timeout}) 必须小于 lock_ttl ({lock_ttl})")
+        self.backend = backend
+        self.parser = parser or WeiboParser()
+        self.namespace = namespace
+        self.result_ttl = result_ttl
+        self.negative_ttl = negative_ttl
+        self.lock_ttl = lock_ttl
+        self.parse_timeout = parse_timeout
+
+    def _key(self, *parts: str) -> str:
+        """生成后端键
+
+        Args:
+            *parts: 键的各部分
+
+        Returns:
+            形如 {namespace}:result:{微博ID} 的键
+        """
+        return ':'.join((self.namespace,) + parts)
+
+    @property
+    def queue_key(self) -> str:
+        """待解析链接队列的键"""
+        return self._key('queue')
+
+    @property
+    def results_key(self) -> str:
+        """已完成结果队列的键（每条链接一条记录，供收集端 brpop 读取）"""
+        return self._key('results')
+
+    async def submit(self, urls: Iterable[str]) -> int:
+        """将链接加入待解析队列
+
+        Args:
+            urls: 链接列表
+
+        Returns:
+            加入的链接数量
+        """
+        urls = [url.strip() for url in urls if url.strip()]
+        if urls:
+            await self.backend.lpush(self.queue_key, *urls)
+        return len(urls)
+
+    async def get_result(self, url: str) -> Optional[Dict[str, Any]]:
+        """从后端读取链接的解析结果
+
+        Args:
+            url: 微博链接
+
+        Returns:
+            与 WeiboParser.parse() 相同结构的结果字典；解析失败时为 {'url': url, 'error': 错误信息}；
+            尚未解析时返回None
+        """
+        return await self._get_cached(self.parser.get_post_id(url), url)
+
+    async def _get_cached(self, post_id: str, url: str) -> Optional[Dict[str, Any]]:
+        """读取共享的解析结果或失败结果
+
+        Args:
+            post_id: 规范化微博ID
+            url: 请求的链接（结果中的 url 替换为该链接）
+
+        Returns:
+            结果字典，没有缓存时返回None
+        """
+        cached = _decode(await self.backend.get(self._key('result', post_id)))
+        if cached is not None:
+            return dict(json.loads(cached), url=url)
+        error = _decode(await self.backend.get(self._key('negative', post_id)))
+        if error is not None:
+            return {'url': url, 'error': error}
+        return None
+
+    async def _release_lock(self, lock_key: str, token: str):
+        """释放微博锁（只释放自己持有的锁，锁已过期并被其他节点获取时不删除）
+
+        比较和删除通过 RELEASE_LOCK_SCRIPT 在后端原子执行
+
+        Args:
+            lock_key: 锁的键
+            token: 获取锁时写入的令牌
+        """
+        await self.backend.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def _load_cookies(self):
+        """从后端加载其他节点获取的访客cookie，替换本地已失效的身份"""
+        for index, identity in enumerate(self.parser.visitor_pool.identities):
+            if identity.jar.is_valid():
+                continue
+            shared = _decode(await self.backend.get(self._key('cookies', str(index))))
+            if shared is not None:
+                identity.jar.load(json.loads(shared))
+
+    async def _publish_cookies(self):
+        """将本地有效的访客cookie写入后端，供其他节点复用"""
+        for index, identity in enumerate(self.parser.visitor_pool.identities):
+            if not identity.jar.is_valid():
+                continue
+            cookies = json.dumps(identity.jar.dump(), sort_keys=True)
+            key = self._key('cookies', str(index))
+            if _decode(await self.backend.get(key)) != cookies:
+                await self.backend.set(key, cookies, ex=identity.jar.DEFAULT_TTL)
+
+    async def process(self, session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+        """解析单条链接：优先使用共享结果，否则获取微博锁后请求上游并共享结果
+
+        Args:
+            session: aiohttp 会话
+            url: 微博链接
+
+        Returns:
+            结果字典；解析失败时为 {'url': url, 'error': 错误信息}
+        """
+        try:
+            # 短链接先解析为微博链接，不同短链接指向同一条微博时共享结果和锁
+            post_id = self.parser.get_post_id(await self.parser.resolve_url(session, url))
+        except (ValueError, WeiboError, aiohttp.ClientError) as e:
+            return {'url': url, 'error': str(e)}
+
+        lock_key = self._key('lock', post_id)
+        while True:
+            cached = await self._get_cached(post_id, url)
+            if cached is not None:
+                return cached
+
+            token = uuid.uuid4().hex
+            if await self.backend.set(lock_key, token, px=self.lock_ttl * 1000, nx=True):
+                break
+            # 其他节点正在解析同一条微博，等待其结果（锁过期后由本节点接手）
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+
+        try:
+            # 获取锁期间其他节点可能刚好写入了结果
+            cached = await self._get_cached(post_id, url)
+            if cached is not None:
+                return cached
+
+            await self._load_cookies()
+            try:
+                result = await self.parser.parse(session, url, timeout=self.parse_timeout)
+            except Exception as e:
+                # 临时性失败（限流、超时、5xx）不缓存，稍后重新提交的同一条微博可以再次解析
+                if not RetryPolicy.is_retryable(e):
+                    await self.backend.set(self._key('negative', post_id), str(e), ex=self.negative_ttl)
+                return {'url': url, 'error': str(e)}
+            finally:
+                await self._publish_cookies()
+
+            await self.backend.set(
+                self._key('result', post_id), json.dumps(result, ensure_ascii=False), ex=self.result_ttl
+            )
+            return result
+        finally:
+            await self._release_lock(lock_key, token)
+
+    async def run(
+        self,
+        session: aiohttp.ClientSession,
+        concurrency: int = 4,
+        idle_timeout: Optional[float] = None
+    ) -> int:
+        """从队列拉取链接并解析，结果写入结果队列
+
+        Args:
+            session: aiohttp 会话
+            concurrency: 节点内并发解析数
+            idle_timeout: 队列持续为空超过该时间（秒）后退出，None 表示一直运行
+
+        Returns:
+            本节点处理的链接数量
+        """
+        processed = 0
+
+        async def consume():
+            nonlocal processed
+            while True:
+                item = await self.backend.brpop(self.queue_key, timeout=idle_timeout or 0)
+                if item is None:
+                    return
+                url = _decode(item[1])
+                result = await self.process(session, url)
+                await self.backend.lpush(self.results_key, json.dumps(result, ensure_ascii=False))
+                processed += 1
+
+        await asyncio.gather(*(consume() for _ in range(concurrency)))
+        return processed
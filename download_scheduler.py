@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+全局下载调度器
+所有媒体下载经由同一个调度器：按优先级排队（交互请求优先于回填），
+同优先级内按微博轮转保证公平，限制每个CDN域名的并发连接数和全局带宽
+"""
+import time
+import asyncio
+from collections import OrderedDict, deque, defaultdict
+from typing import Optional, Dict, Any, Tuple, Mapping, Callable, Awaitable
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+# 优先级，数值越小越先调度
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKFILL = 10
+
+
+class _TokenBucket:
+    """令牌桶，限制全局下载速率"""
+
+    def __init__(self, rate: float):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒允许的字节数
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def consume(self, amount: int):
+        """消耗令牌，令牌不足时等待（允许透支，由后续等待偿还）
+
+        Args:
+            amount: 字节数
+        """
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class DownloadScheduler:
+    """全局下载调度器"""
+
+    # 流式读取响应体时每块的大小
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        per_host_limit: int = 4,
+        bytes_per_second: Optional[float] = None
+    ):
+        """初始化下载调度器
+
+        Args:
+            max_concurrency: 全局最大并发下载数
+            per_host_limit: 每个CDN域名的最大并发下载数
+            bytes_per_second: 全局带宽上限（字节/秒），None 表示不限速
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self._bucket = _TokenBucket(bytes_per_second) if bytes_per_second else None
+
+        # 优先级 -> 分组（通常为微博ID） -> 等待中的任务队列
+        self._queues: Dict[int, OrderedDict] = {}
+        self._active = 0
+        self._active_hosts: Dict[str, int] = defaultdict(int)
+
+        self._started = time.monotonic()
+        self._completed = 0
+        self._not_modified = 0
+        self._failed = 0
+        self._bytes = 0
+
+    def _next_job(self) -> Optional[Dict[str, Any]]:
+        """按优先级、分组轮转取出下一个可以开始的任务（所属域名未达并发上限）
+
+        Returns:
+            任务字典，没有可开始的任务时返回None
+        """
+        for priority in sorted(self._queues):
+            groups = self._queues[priority]
+            for group in list(groups):
+                jobs = groups[group]
+                for job in jobs:
+                    if self._active_hosts[job['host']] < self.per_host_limit:
+                        jobs.remove(job)
+                        if jobs:
+                            # 本组已被调度一次，移到末尾让其他微博先下载
+                            groups.move_to_end(group)
+                        else:
+                            del groups[group]
+                        if not groups:
+                            del self._queues[priority]
+                        return job
+        return None
+
+    def _dispatch(self):
+        """在并发额度内唤醒可以开始的任务"""
+        while self._active < self.max_concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+            self._active += 1
+            self._active_hosts[job['host']] += 1
+            job['future'].set_result(None)
+
+    def _release(self, host: str):
+        """释放任务占用的并发额度并调度后续任务
+
+        Args:
+            host: 任务所属域名
+        """
+        self._active -= 1
+        self._active_hosts[host] -= 1
+        if not self._active_hosts[host]:
+            del self._active_hosts[host]
+        self._dispatch()
+
+    def _remove_job(self, job: Dict[str, Any]):
+        """从等待队列中移除任务（等待期间被取消时使用）
+
+        Args:
+            job: 任务字典
+        """
+        groups = self._queues.get(job['priority'], {})
+        jobs = groups.get(job['group'])
+        if jobs and job in jobs:
+            jobs.remove(job)
+            if not jobs:
+                del groups[job['group']]
+            if not groups:
+                self._queues.pop(job['priority'], None)
+
+    async def _acquire(self, host: str, priority: int, group: Any) -> None:
+        """排队等待下载额度
+
+        Args:
+            host: 下载域名
+            priority: 优先级
+            group: 公平分组
+        """
+        job = {
+            'host': host,
+            'priority': priority,
+            'group': group,
+            'future': asyncio.get_running_loop().create_future(),
+        }
+        self._queues.setdefault(priority, OrderedDict()).setdefault(group, deque()).append(job)
+        self._dispatch()
+        try:
+            await job['future']
+        except asyncio.CancelledError:
+            if job['future'].done() and not job['future'].cancelled():
+                # 已获得额度但未开始下载，归还额度
+                self._release(host)
+            else:
+                self._remove_job(job)
+            raise
+
+    async def download(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        priority: int = PRIORITY_BACKFILL,
+        group: Any = None,
+        sink: Optional[Callable[[bytes], Awaitable[None]]] = None
+    ) -> Tuple[int, bytes, Mapping[str, str]]:
+        """通过调度器下载媒体文件
+
+        Args:
+            session: aiohttp 会话
+            url: 媒体URL
+            headers: 请求头（可带 If-None-Match / If-Modified-Since 发起条件请求）
+            priority: 优先级，PRIORITY_INTERACTIVE 优先于 PRIORITY_BACKFILL
+            group: 公平分组（通常为微博ID），同优先级的分组轮流下载
+            sink: 接收响应体数据块的协程函数，指定时数据块边下载边交给它处理，不在内存中拼接
+
+        Returns:
+            (HTTP状态码, 响应体, 响应头)；状态码不为200或指定了 sink 时响应体为空
+        """
+        host = urlparse(url).hostname or ''
+        await self._acquire(host, priority, group)
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    self._not_modified += 1
+                    return response.status, b'', response.headers
+                if response.status != 200:
+                    self._failed += 1
+                    return response.status, b'', response.headers
+                chunks = []
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    if self._bucket:
+                        await self._bucket.consume(len(chunk))
+                    self._bytes += len(chunk)
+                    if sink is not None:
+                        await sink(chunk)
+                    else:
+                        chunks.append(chunk)
+                self._completed += 1
+                return response.status, b''.join(chunks), response.headers
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._release(host)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取调度器统计信息
+
+        Returns:
+            统计字典，包含:
+            - queued: 各优先级排队中的任务数
+            - active: 进行中的下载数
+            - active_by_host: 各域名进行中的下载数
+            - completed / failed: 已完成 / 失败的下载数
+            - not_modified: 条件请求返回304（未重复传输）的次数
+            - bytes: 已下载字节数
+            - throughput: 平均吞吐量（字节/秒）
+        """
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return {
+            'queued': {
+                priority: sum(len(jobs) for jobs in groups.values())
+                for priority, groups in self._queues.items()
+            },
+            'active': self._active,
+            'active_by_host': dict(self._active_hosts),
+            'completed': self._completed,
+            'not_modified': self._not_modified,
+            'failed': self._failed,
+            'bytes': self._bytes,
+            'throughput': self._bytes / elapsed,
+        }
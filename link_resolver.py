@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+短链接解析
+t.cn 短链接和分享页链接不直接包含微博ID，需要跟随跳转找到真正的微博链接；
+每一跳只发送 HEAD 请求（不支持时改用不读取响应体的 GET），遇到第一个可解析的微博链接即停止。
+短链接指向的地址不会变化，解析结果按 TTL 缓存，同一短链接的并发解析只请求一次
+"""
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Dict, Callable, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+
+from deadline import deadline_scope, run_stage, stage_context
+from weibo_errors import WeiboError, error_for_status, wrap_network_errors
+
+
+class ShortLinkResolver:
+    """短链接解析器，带跳转结果缓存"""
+
+    # 表示跳转的状态码
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+    # 不支持 HEAD 请求时返回的状态码
+    HEAD_UNSUPPORTED_STATUSES = (403, 405, 501)
+
+    def __init__(
+        self,
+        is_target: Callable[[str], bool],
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_hops: int = 5
+    ):
+        """初始化短链接解析器
+
+        Args:
+            is_target: 判断链接是否已是可解析的微博链接，跟随跳转到第一个满足的链接为止
+            ttl: 解析结果的缓存时间（秒）
+            max_entries: 最多缓存的短链接数量，超出时淘汰最久未使用的
+            max_hops: 最多跟随的跳转次数
+        """
+        self.is_target = is_target
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_hops = max_hops
+        # 短链接 -> (解析结果, 过期时间)
+        self._cache: OrderedDict = OrderedDict()
+        # 短链接 -> 进行中的解析任务
+        self._pending: Dict[str, asyncio.Future] = {}
+
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        """规范化短链接作为缓存键：补全协议、去掉锚点（路径区分大小写，保持不变）
+
+        Args:
+            url: 短链接
+
+        Returns:
+            规范化的链接
+        """
+        url = url.strip().split('#', 1)[0]
+        if '//' not in url:
+            url = 'https://' + url
+        return url
+
+    def get(self, url: str) -> Optional[str]:
+        """读取缓存的解析结果
+
+        Args:
+            url: 短链接
+
+        Returns:
+            跳转后的链接，未缓存或已过期时返回None
+        """
+        key = self.normalize(url)
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        resolved, expires = cached
+        if expires <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return resolved
+
+    def _put(self, key: str, resolved: str):
+        """缓存解析结果
+
+        Args:
+            key: 规范化的短链接
+            resolved: 跳转后的链接
+        """
+        self._cache[key] = (resolved, time.monotonic() + self.ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _hop(self, session: aiohttp.ClientSession, url: str) -> Tuple[int, Optional[str]]:
+        """请求一跳，不读取响应体
+
+        Args:
+            session: aiohttp 会话
+            url: 链接
+
+        Returns:
+            (状态码, Location 响应头)
+        """
+        headers = {'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        async with stage_context('resolve', session.head(url, headers=headers, allow_redirects=False)) as response:
+            status, location = response.status, response.headers.get('Location')
+        if status in self.HEAD_UNSUPPORTED_STATUSES:
+            # 只读取响应头，响应体随连接释放丢弃
+            async with stage_context('resolve', session.get(url, headers=headers, allow_redirects=False)) as response:
+                status, location = response.status, response.headers.get('Location')
+        return status, location
+
+    async def _follow(self, session: aiohttp.ClientSession, key: str) -> str:
+        """跟随跳转直到可解析的微博链接或不再跳转的页面
+
+        Args:
+            session: aiohttp 会话
+            key: 规范化的短链接
+
+        Returns:
+            跳转后的链接
+
+        Raises:
+            WeiboError: 请求失败或跳转次数过多
+        """
+        url = key
+        for _ in range(self.max_hops + 1):
+            if url != key and self.is_target(url):
+                break
+            with wrap_network_errors(f"解析短链接失败，链接: {url}"):
+                status, location = await self._hop(session, url)
+            if status in self.REDIRECT_STATUSES and location:
+                url = urljoin(url, location)
+                continue
+            if status >= 400:
+                raise error_for_status(status, f"解析短链接失败，状态码: {status}, 链接: {url}")
+            # 不再跳转的页面（不是微博链接时由调用方报错）
+            break
+        else:
+            raise WeiboError(f"解析短链接失败，跳转次数超过 {self.max_hops}: {key}")
+
+        self._put(key, url)
+        return url
+
+    def _finish(self, key: str, task: asyncio.Future):
+        """解析任务结束：移出进行中的任务，并取走异常（所有调用方都已超时时没有调用方等待）
+
+        Args:
+            key: 规范化的短链接
+            task: 解析任务
+        """
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def resolve(self, session: aiohttp.ClientSession, url: str) -> str:
+        """解析短链接，优先使用缓存
+
+        Args:
+            session: aiohttp 会话
+            url: 短链接
+
+        Returns:
+            跳转后的链接（通常是可解析的微博链接）
+
+        Raises:
+            WeiboError: 请求失败或跳转次数过多
+            StageTimeoutError: 调用方的时间预算耗尽（共享的解析任务继续进行并写入缓存）
+        """
+        cached = self.get(url)
+        if cached is not None:
+            self._hits += 1
+            return cached
+
+        self._misses += 1
+        key = self.normalize(url)
+        task = self._pending.get(key)
+        if task is None:
+            # 共享的解析任务不继承发起者的时间预算，每个调用方只按自己的预算等待
+            with deadline_scope(None):
+                task = asyncio.ensure_future(self._follow(session, key))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # 一个调用方被取消或超时不影响其他等待同一短链接的调用方
+        return await run_stage('resolve', asyncio.shield(task))
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息
+
+        Returns:
+            统计字典，包含 entries（缓存条目数）、hits、misses
+        """
+        return {
+            'entries': len(self._cache),
+            'hits': self._hits,
+            'misses': self._misses,
+        }
@@ -1,8 +1,10 @@
 import aiohttp
-import asyncio
 import json
 import re
 
+from runner import run
+from visitor_cookie import VisitorCookieJar, DEFAULT_COOKIE_FILE
+
 
 async def get_weibo_sub():
     url = "https://visitor.passport.weibo.cn/visitor/genvisitor2"
@@ -23,9 +25,18 @@ async def get_weibo_sub():
             if match:
                 result = json.loads(match.group(1))
                 sub = result.get('data', {}).get('sub', '')
+                subp = result.get('data', {}).get('subp', '')
                 print(sub)
+
+                # 保存到访客cookie文件，WeiboParser 启动时直接复用
+                jar = VisitorCookieJar(DEFAULT_COOKIE_FILE)
+                jar.update(response.cookies.values())
+                if sub:
+                    jar.set('SUB', sub)
+                if subp:
+                    jar.set('SUBP', subp)
             else:
                 print("解析失败")
 
 
-asyncio.run(get_weibo_sub())
+run(get_weibo_sub())
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""
+内容寻址媒体存储
+按微博图片ID / 视频对象ID（从URL中提取）以及下载后的内容哈希索引媒体文件，
+同一媒体在不同微博中出现时只下载一次，各微博目录通过硬链接引用存储中的文件；
+同时按媒体键记录 ETag / Last-Modified（换了图床域名或视频签名的同一媒体共用），
+重复获取时发起条件请求，304 时直接使用已存储的文件；
+下载的数据边接收边计算哈希并写入临时文件，哈希和文件读写都在线程池中执行，不阻塞事件循环
+"""
+import os
+import re
+import json
+import uuid
+import shutil
+import asyncio
+import hashlib
+import threading
+from typing import Optional, Dict, Tuple, Any, Mapping
+from urllib.parse import urlparse
+
+import aiohttp
+
+from download_scheduler import DownloadScheduler, PRIORITY_BACKFILL
+
+
+class MediaStore:
+    """内容寻址媒体存储"""
+
+    # 索引文件名（每行一条 {"key": 媒体键, "blob": 相对路径} 记录，只追加不改写；
+    # 响应带有校验信息时记录额外带有 etag / last_modified，无法提取媒体键的URL以 url:{媒体URL} 为键）
+    INDEX_FILE = 'index.jsonl'
+
+    def __init__(self, root: str):
+        """初始化媒体存储，加载已有索引
+
+        Args:
+            root: 存储根目录
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = {}
+        # 媒体键（没有媒体键时为 url:{媒体URL}）-> {'etag': ..., 'last_modified': ...}
+        self._validators: Dict[str, Dict[str, str]] = {}
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+
+        index_path = os.path.join(root, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        key = record['key']
+                        if 'etag' in record or 'last_modified' in record:
+                            if key.startswith('url:'):
+                                # 旧版本按URL记录校验信息
+                                key = self._validator_key(key[4:])
+                            self._validators[key] = {
+                                'etag': record.get('etag'),
+                                'last_modified': record.get('last_modified'),
+                            }
+                        elif self._index.get(key) != record['blob']:
+                            # 媒体内容已更换，旧的校验信息失效
+                            self._validators.pop(key, None)
+                        self._index[record['key']] = record['blob']
+
+    @staticmethod
+    def media_key(url: str) -> Optional[str]:
+        """从媒体URL中提取与内容无关的稳定键
+
+        - 图片: https://wx1.sinaimg.cn/large/001P0DUIgy1i6c3017bq2j62c03404qs02.jpg
+          -> pic:large/001P0DUIgy1i6c3017bq2j62c03404qs02（不同尺寸是不同文件）
+        - 视频: https://f.video.weibocdn.com/o0/kw4H2Zeflx08spiLJN1m01041200eY1J0E010.mp4?...
+          -> video:kw4H2Zeflx08spiLJN1m01041200eY1J0E010（签名参数不影响文件内容）
+
+        Args:
+            url: 媒体URL
+
+        Returns:
+            媒体键，无法识别的URL返回None
+        """
+        parsed = urlparse(url if '//' in url else '//' + url)
+        host = parsed.hostname or ''
+        if host.endswith('sinaimg.cn'):
+            match = re.match(r'/([^/]+)/([A-Za-z0-9]+)\.\w+$', parsed.path)
+            if match:
+                return f"pic:{match.group(1)}/{match.group(2)}"
+        if 'video' in host:
+            match = re.search(r'/([A-Za-z0-9]+)\.\w+$', parsed.path)
+            if match:
+                return f"video:{match.group(1)}"
+        return None
+
+    def _validator_key(self, url: str) -> str:
+        """获取记录 ETag / Last-Modified 使用的键
+
+        Args:
+            url: 媒体URL
+
+        Returns:
+            媒体键，无法提取时为 url:{媒体URL}
+        """
+        return self.media_key(url) or f"url:{url}"
+
+    def _record(self, key: str, blob: str, **validators: Optional[str]):
+        """记录媒体键到存储文件的映射
+
+        Args:
+            key: 媒体键、url: 键或内容哈希键
+            blob: 存储文件相对路径
+            **validators: 响应附带的 etag / last_modified
+        """
+        with self._lock:
+            if self._index.get(key) == blob and (not validators or self._validators.get(key) == validators):
+                return
+            if validators:
+                self._validators[key] = validators
+            elif self._index.get(key) != blob:
+                self._validators.pop(key, None)
+            self._index[key] = blob
+            with open(os.path.join(self.root, self.INDEX_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(dict({'key': key, 'blob': blob}, **validators)) + '\n')
+
+    def lookup(self, url: str) -> Optional[str]:
+        """查找URL对应的已存储文件
+
+        Args:
+            url: 媒体URL
+
+        Returns:
+            存储文件的绝对路径，未存储时返回None
+        """
+        key = self.media_key(url)
+        blob = self._index.get(key) if key else None
+        if blob:
+            path = os.path.join(self.root, blob)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _cached_blob(self, url: str) -> Optional[str]:
+        """查找带有校验信息的已存储文件（用于条件请求）
+
+        Args:
+            url: 媒体URL
+
+        Returns:
+            存储文件的绝对路径，没有校验信息或文件不存在时返回None
+        """
+        key = self._validator_key(url)
+        blob = self._index.get(key)
+        if blob and key in self._validators:
+            path = os.path.join(self.root, blob)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _conditional_headers(self, url: str, headers: Dict[str, str]) -> Dict[str, str]:
+        """为已存储的媒体URL添加条件请求头
+
+        Args:
+            url: 媒体URL
+            headers: 原始请求头
+
+        Returns:
+            请求头，带有 If-None-Match / If-Modified-Since（如果记录过）
+        """
+        validators = self._validators.get(self._validator_key(url)) or {}
+        headers = dict(headers)
+        if validators.get('etag'):
+            headers['if-none-match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['if-modified-since'] = validators['last_modified']
+        return headers
+
+    def _temp_path(self) -> str:
+        """生成下载中数据使用的临时文件路径
+
+        Returns:
+            存储根目录下 tmp/ 中的唯一路径
+        """
+        directory = os.path.join(self.root, 'tmp')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{uuid.uuid4().hex}.part")
+
+    def put(
+        self,
+        url: str,
+        data: bytes,
+        ext: str,
+        response_headers: Optional[Mapping[str, str]] = None
+    ) -> str:
+        """按内容哈希保存媒体数据，相同内容只保存一份（同步执行，下载时使用 fetch() 流式写入）
+
+        Args:
+            url: 媒体URL
+            data: 媒体数据
+            ext: 文件扩展名（含点）
+            response_headers: 下载响应头，带有 ETag / Last-Modified 时记录下来供条件请求使用
+
+        Returns:
+            存储文件的绝对路径
+        """
+        tmp_path = self._temp_path()
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        return self._commit(tmp_path, hashlib.sha256(data).hexdigest(), url, ext, response_headers)
+
+    def _commit(
+        self,
+        tmp_path: str,
+        digest: str,
+        url: str,
+        ext: str,
+        response_headers: Optional[Mapping[str, str]] = None
+    ) -> str:
+        """将写完的临时文件按内容哈希移入存储并记录索引，已有相同内容时丢弃临时文件
+
+        Args:
+            tmp_path: 临时文件路径
+            digest: 内容的 SHA-256
+            url: 媒体URL
+            ext: 文件扩展名（含点）
+            response_headers: 下载响应头
+
+        Returns:
+            存储文件的绝对路径
+        """
+        blob = self._index.get(f"sha256:{digest}")
+        if blob is None:
+            blob = os.path.join('blobs', digest[:2], f"{digest}{ext}")
+        path = os.path.join(self.root, blob)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+
+        self._record(f"sha256:{digest}", blob)
+        etag = response_headers.get('ETag') if response_headers else None
+        last_modified = response_headers.get('Last-Modified') if response_headers else None
+        validators = {'etag': etag, 'last_modified': last_modified} if etag or last_modified else {}
+        key = self.media_key(url)
+        if key:
+            self._record(key, blob, **validators)
+        elif validators:
+            self._record(f"url:{url}", blob, **validators)
+        return path
+
+    @staticmethod
+    def link(blob_path: str, dest_path: str):
+        """在目标位置引用存储中的文件，优先使用硬链接，跨文件系统时退化为复制
+
+        Args:
+            blob_path: 存储文件路径
+            dest_path: 目标路径
+        """
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        try:
+            os.link(blob_path, dest_path)
+        except OSError:
+            shutil.copyfile(blob_path, dest_path)
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Dict[str, str],
+        ext: str,
+        scheduler: Optional[DownloadScheduler] = None,
+        priority: int = PRIORITY_BACKFILL,
+        group: Any = None,
+        revalidate: bool = False
+    ) -> Tuple[Optional[str], bool]:
+        """获取媒体文件，已存储的媒体不会再次下载
+
+        无法从URL提取媒体键、或要求重新校验时，如果记录过 ETag / Last-Modified，
+        则发起条件请求，服务器返回304时直接使用已存储的文件
+
+        Args:
+            session: aiohttp 会话
+            url: 媒体URL
+            headers: 下载请求头
+            ext: 文件扩展名（含点）
+            scheduler: 下载调度器，指定时下载经由调度器排队和限速
+            priority: 调度优先级
+            group: 调度公平分组（通常为微博ID）
+            revalidate: 已按媒体键存储的文件也向服务器确认是否有更新
+
+        Returns:
+            (存储文件路径, 是否发生了下载)；下载失败时路径为None
+        """
+        path = self.lookup(url)
+        if path and not revalidate:
+            return path, False
+
+        cached_path = self._cached_blob(url)
+        if cached_path:
+            headers = self._conditional_headers(url, headers)
+
+        writer = _BlobWriter(self)
+        try:
+            if scheduler is not None:
+                status, _, response_headers = await scheduler.download(
+                    session, url, headers, priority, group, sink=writer.write
+                )
+            else:
+                async with session.get(url, headers=headers) as response:
+                    status = response.status
+                    response_headers = response.headers
+                    if status == 200:
+                        async for chunk in response.content.iter_chunked(DownloadScheduler.CHUNK_SIZE):
+                            await writer.write(chunk)
+
+            if status == 304 and cached_path:
+                return cached_path, False
+            if status != 200:
+                return None, True
+            return await writer.commit(url, ext, response_headers), True
+        finally:
+            await writer.discard()
+
+
+class _BlobWriter:
+    """流式写入一次下载的数据：边接收边计算哈希并写入临时文件
+
+    哈希计算和文件读写都交给事件循环的默认线程池，按数据块顺序依次执行
+    """
+
+    def __init__(self, store: MediaStore):
+        """初始化写入器（首个数据块到达时才创建临时文件）
+
+        Args:
+            store: 媒体存储
+        """
+        self.store = store
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        # 被取消的 write() 对应的线程可能仍在执行，与 discard() 互斥
+        self._lock = threading.Lock()
+
+    def _write(self, chunk: bytes):
+        """写入一个数据块（在线程池中执行）
+
+        Args:
+            chunk: 数据块
+        """
+        with self._lock:
+            if self._file is None:
+                self._tmp_path = self.store._temp_path()
+                self._file = open(self._tmp_path, 'wb')
+            self._hash.update(chunk)
+            self._file.write(chunk)
+
+    async def write(self, chunk: bytes):
+        """写入一个数据块
+
+        Args:
+            chunk: 数据块
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self._write, chunk)
+
+    def _commit(self, url: str, ext: str, response_headers: Optional[Mapping[str, str]]) -> str:
+        """关闭临时文件并移入存储（在线程池中执行）
+
+        Returns:
+            存储文件的绝对路径
+        """
+        if self._file is None:
+            # 响应体为空
+            self._write(b'')
+        with self._lock:
+            self._file.close()
+            self._file = None
+            tmp_path, self._tmp_path = self._tmp_path, None
+        return self.store._commit(tmp_path, self._hash.hexdigest(), url, ext, response_headers)
+
+    async def commit(
+        self,
+        url: str,
+        ext: str,
+        response_headers: Optional[Mapping[str, str]] = None
+    ) -> str:
+        """完成下载，将数据按内容哈希移入存储
+
+        Args:
+            url: 媒体URL
+            ext: 文件扩展名（含点）
+            response_headers: 下载响应头
+
+        Returns:
+            存储文件的绝对路径
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._commit, url, ext, response_headers
+        )
+
+    def _discard(self):
+        """关闭并删除未提交的临时文件（在线程池中执行）"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._tmp_path is not None:
+                try:
+                    os.remove(self._tmp_path)
+                except OSError:
+                    pass
+                self._tmp_path = None
+
+    async def discard(self):
+        """丢弃未提交的数据（下载失败、304 或已提交时无操作）"""
+        if self._file is not None or self._tmp_path is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._discard)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+重试策略
+只重试临时性失败（WeiboError.retryable 为 True 的异常和网络连接错误），
+重试间隔为带随机抖动的指数退避，并且不会超出调用的时间预算
+"""
+import random
+import asyncio
+from typing import Callable, Awaitable, Any
+
+import aiohttp
+
+from deadline import current_deadline
+from weibo_errors import WeiboError
+
+
+class RetryPolicy:
+    """带抖动的指数退避重试策略"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0
+    ):
+        """初始化重试策略
+
+        Args:
+            max_attempts: 最多尝试次数（包含第一次），1 表示不重试
+            base_delay: 第一次重试前的最长等待时间（秒），之后每次翻倍
+            max_delay: 单次等待时间的上限（秒）
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """判断异常是否值得重试
+
+        Args:
+            error: 异常
+
+        Returns:
+            临时性失败返回True
+        """
+        if isinstance(error, WeiboError):
+            return error.retryable
+        return isinstance(error, aiohttp.ClientError)
+
+    def delay(self, attempt: int) -> float:
+        """计算第 attempt 次重试前的等待时间（full jitter：在退避上限内均匀随机）
+
+        Args:
+            attempt: 重试序号（从1开始）
+
+        Returns:
+            等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """按重试策略执行异步函数
+
+        Args:
+            func: 异步函数
+            *args: 函数参数
+
+        Returns:
+            函数的返回值
+
+        Raises:
+            Exception: 不可重试的异常，或重试次数 / 时间预算用尽后的最后一个异常
+        """
+        attempt = 1
+        while True:
+            try:
+                return await func(*args)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                delay = self.delay(attempt)
+                retry_after = getattr(e, 'retry_after', None)
+                if retry_after is not None:
+                    # 熔断中的接口在冷却结束前重试也只会被直接拒绝
+                    if retry_after > self.max_delay:
+                        raise
+                    delay = max(delay, retry_after)
+                deadline = current_deadline()
+                if deadline is not None and deadline.remaining() <= delay:
+                    # 剩余的时间预算不够再试一次
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+事件循环运行器
+命令行脚本和服务入口统一通过 run() 启动：安装了 uvloop 时使用 uvloop 事件循环，
+配置默认线程池，并可选地监控事件循环延迟（某个回调阻塞事件循环的时长）
+"""
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Coroutine
+
+
+def install_uvloop() -> bool:
+    """安装 uvloop 事件循环策略（可选依赖，pip install uvloop）
+
+    Returns:
+        成功安装返回True，未安装 uvloop 时返回False
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def default_executor_workers() -> int:
+    """默认线程池大小：offload 的解码任务和 DNS 解析等阻塞调用共用，至少8个线程
+
+    Returns:
+        线程数
+    """
+    return max(8, (os.cpu_count() or 1) + 4)
+
+
+class LoopLagMonitor:
+    """事件循环延迟监控：定时休眠，实际唤醒时间比预期晚多少即为事件循环被阻塞的时长"""
+
+    def __init__(self, interval: float = 0.1):
+        """初始化延迟监控
+
+        Args:
+            interval: 采样间隔（秒）
+        """
+        self.interval = interval
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        """采样循环"""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - start - self.interval, 0.0)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+
+    def start(self):
+        """在当前事件循环中开始采样"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """停止采样"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> 'LoopLagMonitor':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取延迟统计
+
+        Returns:
+            统计字典，包含 samples（采样次数）、last_lag / max_lag / avg_lag（秒）
+        """
+        return {
+            'samples': self.samples,
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+            'avg_lag': self.total_lag / self.samples if self.samples else 0.0,
+        }
+
+
+def run(
+    main: Coroutine,
+    use_uvloop: bool = True,
+    executor_workers: Optional[int] = None,
+    lag_monitor: Optional[LoopLagMonitor] = None
+) -> Any:
+    """运行协程直到完成，替代 asyncio.run()
+
+    Args:
+        main: 要运行的协程
+        use_uvloop: 安装了 uvloop 时使用 uvloop 事件循环
+        executor_workers: 默认线程池大小，默认为 default_executor_workers()
+        lag_monitor: 事件循环延迟监控，指定时在运行期间采样
+
+    Returns:
+        协程的返回值
+    """
+    if use_uvloop:
+        install_uvloop()
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=executor_workers or default_executor_workers()
+        ))
+        if lag_monitor is None:
+            return await main
+        async with lag_monitor:
+            return await main
+
+    return asyncio.run(_main())
@@ -6,7 +6,9 @@
 import asyncio
 import aiohttp
 import json
+from runner import run
 from weibo_parser import WeiboParser
+from visitor_cookie import VisitorCookieJar, DEFAULT_COOKIE_FILE
 
 
 async def test_single_url(parser: WeiboParser, session: aiohttp.ClientSession, url: str):
@@ -70,7 +72,7 @@ async def main():
         "https://weibo.com/1859841950/QdV89zORJ"
     ]
     
-    parser = WeiboParser()
+    parser = WeiboParser(VisitorCookieJar(DEFAULT_COOKIE_FILE))
     
     async with aiohttp.ClientSession() as session:
         for url in test_urls:
@@ -84,5 +86,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
 
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+离线单元测试，不访问网络
+运行: python -m pytest tests 或 python -m unittest discover tests
+"""
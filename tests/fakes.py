@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+测试用的离线 aiohttp 会话替身
+"""
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from visitor_cookie import VisitorCookieJar
+from visitor_pool import VisitorPool
+
+
+class FakeContent:
+    """响应体数据流"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def iter_chunked(self, size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.data), size):
+            yield self.data[start:start + size]
+
+
+class FakeResponse:
+    """只实现解析器用到的 aiohttp 响应接口"""
+
+    def __init__(self, status: int = 200, body: Any = '', headers: Optional[Dict[str, str]] = None):
+        """初始化响应
+
+        Args:
+            status: 状态码
+            body: 响应体，非字符串时按 JSON 编码
+            headers: 响应头
+        """
+        self.status = status
+        self.body = body if isinstance(body, str) else json.dumps(body)
+        self.headers = headers or {}
+        self.cookies: Dict[str, Any] = {}
+        self.content = FakeContent(self.body.encode('utf-8'))
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def text(self) -> str:
+        return self.body
+
+    async def read(self) -> bytes:
+        return self.body.encode('utf-8')
+
+    async def json(self, **kwargs: Any) -> Any:
+        return json.loads(self.body)
+
+
+class FakeSession:
+    """按 handler 返回响应的会话，记录每次请求"""
+
+    def __init__(self, handler: Callable[[str, str, Dict[str, Any]], FakeResponse]):
+        """初始化会话
+
+        Args:
+            handler: (method, url, kwargs) -> FakeResponse
+        """
+        self.handler = handler
+        self.calls: List[Tuple[str, str]] = []
+        self.cookie_jar = aiohttp.DummyCookieJar()
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append((method, url))
+        return self.handler(method, url, kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self._request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self._request('POST', url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self._request('HEAD', url, **kwargs)
+
+
+def ready_visitor_pool() -> VisitorPool:
+    """创建已持有访客cookie的身份池，解析时不请求 genvisitor2
+
+    Returns:
+        访客身份池
+    """
+    jar = VisitorCookieJar()
+    jar.set('SUB', 'test-sub')
+    jar.set('SUBP', 'test-subp')
+    return VisitorPool([jar])
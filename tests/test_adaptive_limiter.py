@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+自适应并发限制器：并发上限的加性增、乘性减和优先级分道
+"""
+import asyncio
+import random
+import unittest
+
+from adaptive_limiter import AdaptiveLimiter
+from download_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+
+
+# 判断延迟突增之前需要的样本数
+LATENCY_WARMUP = AdaptiveLimiter.LATENCY_MIN_SAMPLES
+
+
+class LimitAdjustmentTest(unittest.TestCase):
+    """根据请求结果调整并发上限"""
+
+    def test_successes_raise_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=8)
+        for _ in range(200):
+            limiter._record('ajax', 0.05, 200, False)
+        self.assertEqual(limiter.stats()['limit'], 8)
+        self.assertEqual(limiter.stats()['decreases'], 0)
+
+    def test_throttle_halves_limit_once_per_latency_window(self):
+        limiter = AdaptiveLimiter(initial_limit=16)
+        for _ in range(LATENCY_WARMUP):
+            limiter._record('ajax', 10.0, 200, False)
+        limit = limiter.limit
+        limiter._record('ajax', 10.0, 429, False)
+        limiter._record('ajax', 10.0, 429, False)
+        self.assertEqual(limiter.stats()['decreases'], 1)
+        self.assertAlmostEqual(limiter.limit, limit * limiter.backoff)
+        self.assertEqual(limiter.stats()['throttled'], 2)
+
+    def test_limit_never_below_min(self):
+        limiter = AdaptiveLimiter(initial_limit=2, min_limit=1)
+        for _ in range(5):
+            limiter._last_decrease = 0.0
+            limiter._record('ajax', 0.0, 418, False)
+        self.assertEqual(limiter.stats()['limit'], 1)
+
+    def test_mixed_endpoints_are_not_spikes(self):
+        rng = random.Random(1)
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for index in range(2000):
+            if index % 5 == 0:
+                limiter._record('mobile', 0.2 * rng.uniform(0.8, 1.2), 200, False)
+            else:
+                limiter._record('ajax', 0.05 * rng.uniform(0.8, 1.2), 200, False)
+        stats = limiter.stats()
+        self.assertEqual(stats['decreases'], 0)
+        self.assertGreater(stats['limit'], 8)
+        self.assertEqual(set(stats['latency']), {'ajax', 'mobile'})
+
+    def test_spike_needs_baseline_samples(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        limiter._record('ajax', 0.01, 200, False)
+        limiter._record('ajax', 1.0, 200, False)
+        self.assertEqual(limiter.stats()['decreases'], 0)
+
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for _ in range(LATENCY_WARMUP):
+            limiter._record('ajax', 0.01, 200, False)
+        limiter._record('ajax', 1.0, 200, False)
+        self.assertEqual(limiter.stats()['decreases'], 1)
+
+    def test_error_rate_lowers_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        for _ in range(3):
+            limiter._record('tv', 0.0, 503, False)
+        self.assertEqual(limiter.stats()['decreases'], 1)
+        self.assertEqual(limiter.stats()['errors'], 3)
+
+
+class PriorityLaneTest(unittest.IsolatedAsyncioTestCase):
+    """等待中的请求按优先级获得额度"""
+
+    async def test_interactive_waiter_goes_first(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        release = asyncio.Event()
+        order = []
+
+        async def call(name, priority):
+            async with limiter.request(priority, 'ajax') as upstream:
+                order.append(name)
+                upstream.status = 200
+                await release.wait()
+
+        holders = [asyncio.create_task(call(f'hold{i}', PRIORITY_INTERACTIVE)) for i in range(2)]
+        await asyncio.sleep(0)
+        backfill = asyncio.create_task(call('backfill', PRIORITY_BACKFILL))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call('interactive', PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.stats()['waiting'], {PRIORITY_BACKFILL: 1, PRIORITY_INTERACTIVE: 1})
+
+        release.set()
+        await asyncio.gather(*holders, backfill, interactive)
+        self.assertEqual(order, ['hold0', 'hold1', 'interactive', 'backfill'])
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+    async def test_backfill_cannot_use_interactive_reserve(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        release = asyncio.Event()
+
+        async def call(priority):
+            async with limiter.request(priority, 'ajax') as upstream:
+                upstream.status = 200
+                await release.wait()
+
+        tasks = [asyncio.create_task(call(PRIORITY_BACKFILL)) for _ in range(4)]
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.stats()['in_flight'], 3)
+        self.assertEqual(limiter.stats()['waiting'], {PRIORITY_BACKFILL: 1})
+
+        tasks.append(asyncio.create_task(call(PRIORITY_INTERACTIVE)))
+        await asyncio.sleep(0)
+        self.assertEqual(limiter.stats()['in_flight'], 4)
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_cancelled_waiter_is_not_recorded(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.request(PRIORITY_INTERACTIVE, 'ajax') as upstream:
+                upstream.status = 200
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        release.set()
+        await holder
+        self.assertEqual(limiter.stats()['completed'], 1)
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器：关闭、打开、半开状态之间的转换
+"""
+import asyncio
+import unittest
+
+import aiohttp
+
+from circuit_breaker import CircuitBreaker, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+from weibo_errors import CircuitOpenError, NotFoundError, StageTimeoutError, UpstreamError
+
+
+RESET_TIMEOUT = 0.05
+
+
+class CircuitBreakerTest(unittest.IsolatedAsyncioTestCase):
+    """CircuitBreaker.request() 的状态转换"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('ajax', failure_threshold=2, reset_timeout=RESET_TIMEOUT)
+
+    async def call(self, error=None):
+        async with self.breaker.request():
+            if error is not None:
+                raise error
+
+    async def fail(self, error=None):
+        with self.assertRaises(Exception):
+            await self.call(error or aiohttp.ClientConnectionError('refused'))
+
+    async def open_breaker(self):
+        await self.fail()
+        await self.fail(UpstreamError('bad gateway', 502))
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    async def test_opens_after_consecutive_failures(self):
+        await self.fail()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        await self.fail(UpstreamError('bad gateway', 502))
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitOpenError) as context:
+            await self.call()
+        self.assertGreater(context.exception.retry_after, 0)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    async def test_success_resets_failure_count(self):
+        await self.fail()
+        await self.call()
+        await self.fail()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    async def test_responses_and_queue_timeouts_are_not_failures(self):
+        for _ in range(3):
+            await self.fail(NotFoundError('deleted', 404))
+            await self.fail(StageTimeoutError('queue', 1.0))
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        await self.fail(StageTimeoutError('request', 1.0))
+        await self.fail(asyncio.TimeoutError())
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    async def test_half_open_probe_success_closes(self):
+        await self.open_breaker()
+        await asyncio.sleep(RESET_TIMEOUT * 1.5)
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        await self.call()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertEqual(self.breaker.stats()['failures'], 0)
+
+    async def test_half_open_probe_failure_reopens(self):
+        await self.open_breaker()
+        await asyncio.sleep(RESET_TIMEOUT * 1.5)
+        await self.fail()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertEqual(self.breaker.stats()['opened'], 2)
+
+    async def test_half_open_admits_one_probe(self):
+        await self.open_breaker()
+        await asyncio.sleep(RESET_TIMEOUT * 1.5)
+        release = asyncio.Event()
+
+        async def probe():
+            async with self.breaker.request():
+                await release.wait()
+
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        with self.assertRaises(CircuitOpenError):
+            await self.call()
+        release.set()
+        await task
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    async def test_cancelled_probe_frees_the_slot(self):
+        await self.open_breaker()
+        await asyncio.sleep(RESET_TIMEOUT * 1.5)
+
+        async def probe():
+            async with self.breaker.request():
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        await self.call()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
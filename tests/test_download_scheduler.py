@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+全局下载调度器：优先级、分组轮转和并发限制
+"""
+import asyncio
+import unittest
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from download_scheduler import DownloadScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+from tests.fakes import FakeResponse, FakeSession
+
+
+class GatedResponse(FakeResponse):
+    """收到响应头之前等待放行的响应，记录各域名的并发数"""
+
+    def __init__(self, cdn: 'FakeCdn', url: str):
+        super().__init__(200, 'x' * 10)
+        self.cdn = cdn
+        self.host = urlparse(url).hostname
+
+    async def __aenter__(self) -> 'GatedResponse':
+        self.cdn.active[self.host] += 1
+        self.cdn.peak[self.host] = max(self.cdn.peak[self.host], self.cdn.active[self.host])
+        self.cdn.peak_total = max(self.cdn.peak_total, sum(self.cdn.active.values()))
+        await self.cdn.release.wait()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.cdn.active[self.host] -= 1
+
+
+class FakeCdn:
+    """记录下载开始顺序和并发数的CDN"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.active = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.peak_total = 0
+        self.started = []
+
+    def __call__(self, method, url, kwargs):
+        self.started.append(url.rsplit('/', 1)[1])
+        return GatedResponse(self, url)
+
+
+async def settle():
+    """让已就绪的任务都运行到下一个等待点"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class DownloadSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """DownloadScheduler.download() 的调度顺序和并发限制"""
+
+    async def asyncSetUp(self):
+        self.cdn = FakeCdn()
+        self.session = FakeSession(self.cdn)
+
+    def download(self, scheduler, name, priority=PRIORITY_BACKFILL, group=None, host='wx1.sinaimg.cn'):
+        return asyncio.create_task(
+            scheduler.download(self.session, f'https://{host}/large/{name}', priority=priority, group=group)
+        )
+
+    async def test_per_host_and_global_limits(self):
+        scheduler = DownloadScheduler(max_concurrency=3, per_host_limit=2)
+        tasks = [self.download(scheduler, f'a{i}') for i in range(4)]
+        tasks += [self.download(scheduler, f'b{i}', host='wx2.sinaimg.cn') for i in range(2)]
+        await settle()
+        stats = scheduler.stats()
+        self.assertEqual(stats['active'], 3)
+        self.assertEqual(stats['active_by_host'], {'wx1.sinaimg.cn': 2, 'wx2.sinaimg.cn': 1})
+
+        self.cdn.release.set()
+        results = await asyncio.gather(*tasks)
+        self.assertTrue(all(status == 200 and body == b'x' * 10 for status, body, _ in results))
+        self.assertEqual(self.cdn.peak['wx1.sinaimg.cn'], 2)
+        self.assertEqual(self.cdn.peak_total, 3)
+        self.assertEqual(scheduler.stats()['completed'], 6)
+        self.assertEqual(scheduler.stats()['active'], 0)
+
+    async def test_blocked_host_does_not_hold_up_other_hosts(self):
+        scheduler = DownloadScheduler(max_concurrency=4, per_host_limit=1)
+        tasks = [self.download(scheduler, 'a0'), self.download(scheduler, 'a1')]
+        tasks.append(self.download(scheduler, 'b0', host='wx2.sinaimg.cn'))
+        await settle()
+        self.assertEqual(self.cdn.started, ['a0', 'b0'])
+        self.cdn.release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_interactive_before_backfill(self):
+        scheduler = DownloadScheduler(max_concurrency=1)
+        tasks = [self.download(scheduler, 'hold')]
+        await settle()
+        tasks.append(self.download(scheduler, 'backfill', PRIORITY_BACKFILL))
+        tasks.append(self.download(scheduler, 'interactive', PRIORITY_INTERACTIVE))
+        await settle()
+        self.assertEqual(scheduler.stats()['queued'], {PRIORITY_BACKFILL: 1, PRIORITY_INTERACTIVE: 1})
+
+        self.cdn.release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(self.cdn.started, ['hold', 'interactive', 'backfill'])
+
+    async def test_groups_take_turns(self):
+        scheduler = DownloadScheduler(max_concurrency=1)
+        tasks = [self.download(scheduler, 'hold')]
+        await settle()
+        for name, group in (('a1', 'A'), ('a2', 'A'), ('a3', 'A'), ('b1', 'B'), ('b2', 'B')):
+            tasks.append(self.download(scheduler, name, group=group))
+        await settle()
+
+        self.cdn.release.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(self.cdn.started, ['hold', 'a1', 'b1', 'a2', 'b2', 'a3'])
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = DownloadScheduler(max_concurrency=1)
+        hold = self.download(scheduler, 'hold')
+        waiter = self.download(scheduler, 'waiter')
+        await settle()
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(scheduler.stats()['queued'], {})
+
+        self.cdn.release.set()
+        await hold
+        self.assertEqual(self.cdn.started, ['hold'])
+        self.assertEqual(scheduler.stats()['active'], 0)
+
+    async def test_sink_receives_chunks_and_not_modified_is_counted(self):
+        scheduler = DownloadScheduler()
+        chunks = []
+
+        async def sink(chunk):
+            chunks.append(chunk)
+
+        session = FakeSession(lambda method, url, kwargs: FakeResponse(200, 'y' * 100))
+        status, body, _ = await scheduler.download(session, 'https://wx1.sinaimg.cn/large/a.jpg', sink=sink)
+        self.assertEqual((status, body, b''.join(chunks)), (200, b'', b'y' * 100))
+
+        session = FakeSession(lambda method, url, kwargs: FakeResponse(304))
+        status, _, _ = await scheduler.download(session, 'https://wx1.sinaimg.cn/large/a.jpg')
+        self.assertEqual(status, 304)
+        self.assertEqual(scheduler.stats()['not_modified'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+流式链接提取：链接被块边界截断时的匹配
+"""
+import io
+import unittest
+
+from weibo_parser import WeiboParser
+
+
+TEXT = (
+    '看这个 https://weibo.com/1566936885/QdC5HtUjg 还有 https://m.weibo.cn/detail/5224958596222067，'
+    '以及 https://video.weibo.com/show?fid=1034:5233218052358208 '
+    '重复 https://weibo.com/1566936885/5232446897127970 和 http://t.cn/A6abcdE 结束'
+)
+
+EXPECTED = [
+    'https://weibo.com/1566936885/QdC5HtUjg',
+    'https://m.weibo.cn/detail/5224958596222067',
+    'https://video.weibo.com/show?fid=1034:5233218052358208',
+    'http://t.cn/A6abcdE',
+]
+
+
+class ChunkBoundaryTest(unittest.TestCase):
+    """链接跨越块边界时与整段匹配的结果一致"""
+
+    def setUp(self):
+        self.parser = WeiboParser()
+
+    def test_whole_text(self):
+        self.assertEqual(self.parser.extract_links(TEXT), EXPECTED)
+
+    def test_every_split_position(self):
+        for split in range(1, len(TEXT)):
+            with self.subTest(split=split):
+                links = list(self.parser.iter_links([TEXT[:split], TEXT[split:]]))
+                self.assertEqual(links, EXPECTED)
+
+    def test_small_text_chunks(self):
+        for chunk_size in (1, 2, 3, 7, 16, 64):
+            with self.subTest(chunk_size=chunk_size):
+                links = list(self.parser.iter_links(io.StringIO(TEXT), chunk_size=chunk_size))
+                self.assertEqual(links, EXPECTED)
+
+    def test_byte_chunks_split_inside_utf8_characters(self):
+        data = TEXT.encode('utf-8')
+        for chunk_size in (1, 2, 5, 13):
+            with self.subTest(chunk_size=chunk_size):
+                links = list(self.parser.iter_links(io.BytesIO(data), chunk_size=chunk_size))
+                self.assertEqual(links, EXPECTED)
+
+    def test_same_post_across_chunks_is_returned_once(self):
+        chunks = ['https://weibo.com/1566936885/QdC5', 'HtUjg x ', 'https://weibo.com/1566936885/5232446897127970']
+        self.assertEqual(list(self.parser.iter_links(chunks)), ['https://weibo.com/1566936885/QdC5HtUjg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+短链接解析：并发调用共享一次解析、各自的时间预算和结果缓存
+"""
+import asyncio
+import unittest
+
+import aiohttp
+
+from deadline import deadline_scope
+from link_resolver import ShortLinkResolver
+from weibo_errors import NetworkError, StageTimeoutError
+from weibo_parser import WeiboParser
+from tests.fakes import FakeResponse, FakeSession
+
+
+TARGET = 'https://weibo.com/1566936885/QdC5HtUjg?refer_flag=1001030103_'
+
+
+def is_target(url: str) -> bool:
+    return 'weibo.com/1566936885/' in url
+
+
+class SlowResponse(FakeResponse):
+    """延迟返回响应头的响应"""
+
+    def __init__(self, delay: float, status: int, headers=None):
+        super().__init__(status, '', headers)
+        self.delay = delay
+
+    async def __aenter__(self) -> 'SlowResponse':
+        await asyncio.sleep(self.delay)
+        return self
+
+
+def redirect_once(delay: float = 0.0):
+    """t.cn 跳转到 TARGET 的上游"""
+    def handler(method, url, kwargs):
+        if 't.cn/' in url:
+            return SlowResponse(delay, 302, {'Location': TARGET})
+        return FakeResponse(404)
+    return handler
+
+
+class ShortLinkResolverTest(unittest.IsolatedAsyncioTestCase):
+    """ShortLinkResolver.resolve()"""
+
+    async def test_concurrent_callers_share_one_resolution(self):
+        resolver = ShortLinkResolver(is_target)
+        session = FakeSession(redirect_once(0.01))
+        results = await asyncio.gather(*(resolver.resolve(session, 't.cn/A6abcd') for _ in range(5)))
+        self.assertEqual(results, [TARGET] * 5)
+        self.assertEqual(session.calls, [('HEAD', 'https://t.cn/A6abcd')])
+
+        self.assertEqual(await resolver.resolve(session, 'https://t.cn/A6abcd#share'), TARGET)
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(resolver.stats(), {'entries': 1, 'hits': 1, 'misses': 5})
+
+    async def test_each_caller_keeps_its_own_deadline(self):
+        resolver = ShortLinkResolver(is_target)
+        session = FakeSession(redirect_once(0.2))
+
+        async def short_budget():
+            with deadline_scope(0.05):
+                return await resolver.resolve(session, 't.cn/A6abcd')
+
+        async def no_budget():
+            await asyncio.sleep(0.01)
+            return await resolver.resolve(session, 't.cn/A6abcd')
+
+        first, second = await asyncio.gather(short_budget(), no_budget(), return_exceptions=True)
+        self.assertIsInstance(first, StageTimeoutError)
+        self.assertEqual(first.stage, 'resolve')
+        self.assertEqual(second, TARGET)
+        self.assertEqual(len(session.calls), 1)
+
+    async def test_joining_caller_is_bounded_by_its_budget(self):
+        resolver = ShortLinkResolver(is_target)
+        session = FakeSession(redirect_once(0.3))
+        first = asyncio.create_task(resolver.resolve(session, 't.cn/A6abcd'))
+        await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with self.assertRaises(StageTimeoutError), deadline_scope(0.05):
+            await resolver.resolve(session, 't.cn/A6abcd')
+        self.assertLess(loop.time() - started, 0.2)
+        self.assertEqual(await first, TARGET)
+
+    async def test_follows_chain_and_falls_back_to_get(self):
+        def handler(method, url, kwargs):
+            if 't.cn/' in url:
+                return FakeResponse(302, headers={'Location': 'https://share.api.weibo.cn/share/1.html'})
+            if method == 'HEAD':
+                return FakeResponse(405)
+            return FakeResponse(302, headers={'Location': TARGET})
+
+        resolver = ShortLinkResolver(is_target)
+        session = FakeSession(handler)
+        self.assertEqual(await resolver.resolve(session, 't.cn/A6abcd'), TARGET)
+        self.assertEqual([method for method, _ in session.calls], ['HEAD', 'HEAD', 'GET'])
+
+    async def test_failures_are_typed_and_not_cached(self):
+        def refused(method, url, kwargs):
+            raise aiohttp.ClientConnectionError('refused')
+
+        resolver = ShortLinkResolver(is_target)
+        with self.assertRaises(NetworkError):
+            await resolver.resolve(FakeSession(refused), 't.cn/A6abcd')
+        self.assertEqual(await resolver.resolve(FakeSession(redirect_once()), 't.cn/A6abcd'), TARGET)
+
+
+class ResolveUrlTest(unittest.IsolatedAsyncioTestCase):
+    """WeiboParser.resolve_url() 和 get_post_id()"""
+
+    async def test_resolved_url_drops_tracking_query(self):
+        parser = WeiboParser()
+        session = FakeSession(redirect_once())
+        self.assertEqual(
+            await parser.resolve_url(session, 'https://t.cn/A6abcd'),
+            'https://weibo.com/1566936885/QdC5HtUjg'
+        )
+        self.assertEqual(parser.get_post_id('https://t.cn/A6abcd'), '5232446897127970')
+
+    async def test_video_target_keeps_fid(self):
+        video = 'https://video.weibo.com/show?fid=1034:5233218052358208#t'
+        parser = WeiboParser()
+        session = FakeSession(lambda method, url, kwargs: FakeResponse(302, headers={'Location': video}))
+        self.assertEqual(
+            await parser.resolve_url(session, 'https://t.cn/V1'),
+            'https://video.weibo.com/show?fid=1034:5233218052358208'
+        )
+        self.assertEqual(parser.get_post_id('https://t.cn/V1'), 'video:1034:5233218052358208')
+
+    async def test_non_weibo_target_is_rejected(self):
+        parser = WeiboParser()
+        session = FakeSession(
+            lambda method, url, kwargs: FakeResponse(302, headers={'Location': 'https://example.com/'})
+            if 't.cn/' in url else FakeResponse(200)
+        )
+        with self.assertRaises(ValueError):
+            await parser.resolve_url(session, 'https://t.cn/bad')
+
+
+if __name__ == '__main__':
+    unittest.main()
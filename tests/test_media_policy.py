@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+视频版本排序和清晰度筛选
+"""
+import unittest
+
+from weibo_parser import WeiboParser, MediaPolicy
+
+
+class VideoDetailsRankingTest(unittest.TestCase):
+    """video_details 只提供清晰度（高度）的视频版本"""
+
+    def setUp(self):
+        parser = WeiboParser()
+        details = {
+            '480': {'url': 'https://f.video.weibocdn.com/480.mp4'},
+            '1080': {'url': 'https://f.video.weibocdn.com/1080.mp4'},
+            '720': {'url': 'https://f.video.weibocdn.com/720.mp4'},
+        }
+        self.parser = parser
+        self.item = parser._build_video_item(parser._extract_video_variants_from_details(details))
+
+    def test_default_picks_highest_resolution(self):
+        media_urls, _ = self.parser._select_media([self.item])
+        self.assertEqual(media_urls, ['https://f.video.weibocdn.com/1080.mp4'])
+
+    def test_max_height_applies_to_height_only_variants(self):
+        media_urls, _ = self.parser._select_media([self.item], MediaPolicy(max_height=720))
+        self.assertEqual(media_urls, ['https://f.video.weibocdn.com/720.mp4'])
+
+    def test_video_resolution(self):
+        self.assertEqual(MediaPolicy.video_resolution({'width': 1920, 'height': 1080}), 1080)
+        self.assertEqual(MediaPolicy.video_resolution({'width': None, 'height': 720}), 720)
+        self.assertIsNone(MediaPolicy.video_resolution({'width': None, 'height': None}))
+
+
+if __name__ == '__main__':
+    unittest.main()
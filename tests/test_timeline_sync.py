@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+增量同步时间线：检查点和被 max_pages 截断后的续传
+"""
+import os
+import re
+import json
+import tempfile
+import unittest
+
+from checkpoint_store import TimelineCheckpointStore
+from weibo_parser import WeiboParser
+from tests.fakes import FakeResponse, FakeSession, ready_visitor_pool
+
+
+UID = '1566936885'
+PAGE_SIZE = 2
+
+
+def make_status(status_id: int) -> dict:
+    """构造一条带一张图片的时间线微博"""
+    return {
+        'idstr': str(status_id),
+        'mblogid': f'M{status_id}',
+        'created_at': 'Thu Nov 13 21:18:29 +0800 2025',
+        'text_raw': '',
+        'user': {'screen_name': 'u', 'id': int(UID)},
+        'pic_num': 1,
+        'pic_infos': {'p': {'type': 'pic', 'large': {'url': f'https://wx1.sinaimg.cn/large/p{status_id}.jpg'}}},
+    }
+
+
+class FakeTimeline:
+    """按页码返回时间线的上游，微博ID从新到旧排列"""
+
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.pages = []
+
+    def __call__(self, method, url, kwargs):
+        page = int(re.search(r'page=(\d+)', url).group(1))
+        self.pages.append(page)
+        ids = self.ids[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        return FakeResponse(200, {'ok': 1, 'data': {'list': [make_status(i) for i in ids]}})
+
+
+class TimelineSyncTest(unittest.IsolatedAsyncioTestCase):
+    """sync_user_timeline 与 TimelineCheckpointStore"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'checkpoints.json')
+        self.parser = WeiboParser(visitor_pool=ready_visitor_pool())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def sync(self, timeline, max_pages=None, store=None):
+        store = store or TimelineCheckpointStore(self.path)
+        results = self.parser.sync_user_timeline(FakeSession(timeline), UID, store, max_pages=max_pages)
+        return [int(result['url'].rsplit('/M', 1)[1]) async for result in results]
+
+    async def test_first_sync_without_limit_sets_checkpoint(self):
+        timeline = FakeTimeline(range(6, 0, -1))
+        self.assertEqual(await self.sync(timeline), [6, 5, 4, 3, 2, 1])
+        self.assertEqual(TimelineCheckpointStore(self.path).get(UID), 6)
+
+        timeline.ids[:0] = [8, 7]
+        self.assertEqual(await self.sync(timeline), [8, 7])
+        self.assertEqual(TimelineCheckpointStore(self.path).get(UID), 8)
+
+    async def test_truncated_first_sync_resumes_until_complete(self):
+        timeline = FakeTimeline(range(10, 0, -1))
+        seen = []
+        for _ in range(10):
+            seen.extend(await self.sync(timeline, max_pages=2))
+            if TimelineCheckpointStore(self.path).get(UID) is not None:
+                break
+        self.assertEqual(sorted(seen), list(range(1, 11)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+        store = TimelineCheckpointStore(self.path)
+        self.assertEqual(store.get(UID), 10)
+        self.assertIsNone(store.get_cursor(UID))
+
+    async def test_truncated_sync_keeps_checkpoint_and_saves_cursor(self):
+        timeline = FakeTimeline(range(10, 0, -1))
+        store = TimelineCheckpointStore(self.path)
+        store.set(UID, 4)
+
+        self.assertEqual(await self.sync(timeline, max_pages=1), [10, 9])
+        store = TimelineCheckpointStore(self.path)
+        self.assertEqual(store.get(UID), 4)
+        self.assertEqual(store.get_cursor(UID), {'pending_id': 10, 'max_id': 9, 'page': 2})
+
+        # 续传期间发布的新微博不影响续传，之后的同步再获取
+        timeline.ids[:0] = [12, 11]
+        self.assertEqual(await self.sync(timeline), [8, 7, 6, 5])
+        self.assertEqual(TimelineCheckpointStore(self.path).get(UID), 10)
+        self.assertEqual(await self.sync(timeline), [12, 11])
+        self.assertEqual(TimelineCheckpointStore(self.path).get(UID), 12)
+
+    async def test_interrupted_sync_does_not_advance(self):
+        timeline = FakeTimeline(range(6, 0, -1))
+        store = TimelineCheckpointStore(self.path)
+        store.set(UID, 2)
+        results = self.parser.sync_user_timeline(FakeSession(timeline), UID, store)
+        async for _ in results:
+            break
+        await results.aclose()
+        self.assertEqual(store.get(UID), 2)
+        self.assertIsNone(store.get_cursor(UID))
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    """检查点文件的读写"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'checkpoints.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        store = TimelineCheckpointStore(self.path)
+        store.set('1', 100)
+        store.set_cursor('2', 50, 40, 3)
+        reloaded = TimelineCheckpointStore(self.path)
+        self.assertEqual(reloaded.get('1'), 100)
+        self.assertIsNone(reloaded.get_cursor('1'))
+        self.assertIsNone(reloaded.get('2'))
+        self.assertEqual(reloaded.get_cursor('2'), {'pending_id': 50, 'max_id': 40, 'page': 3})
+
+    def test_legacy_format(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'1': '100'}, f)
+        self.assertEqual(TimelineCheckpointStore(self.path).get('1'), 100)
+
+    def test_corrupt_file_starts_empty(self):
+        for content in ('{"1": 10', '[1, 2]', '{"1": "abc"}'):
+            with self.subTest(content=content):
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                with self.assertLogs('checkpoint_store', 'WARNING'):
+                    store = TimelineCheckpointStore(self.path)
+                self.assertIsNone(store.get('1'))
+                store.set('1', 5)
+                self.assertEqual(TimelineCheckpointStore(self.path).get('1'), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+访客cookie持久化
+保存访客cookie（SUB、SUBP、XSRF-TOKEN 等）及其过期时间，进程重启后校验并复用，
+首次解析无需再请求 genvisitor2
+"""
+import os
+import json
+import time
+import threading
+from http.cookiejar import http2time
+from http.cookies import Morsel
+from typing import Optional, Dict, Iterable
+
+
+# 默认的cookie文件路径
+DEFAULT_COOKIE_FILE = 'visitor_cookies.json'
+
+
+class VisitorCookieJar:
+    """访客cookie存储，可选持久化到本地文件"""
+
+    # 必须存在的cookie，缺失时视为无效
+    REQUIRED_COOKIES = ('SUB',)
+
+    # 响应未声明过期时间的cookie的有效期（秒）
+    DEFAULT_TTL = 24 * 3600
+
+    # 距离过期不足该时间（秒）的cookie视为已过期，避免请求途中失效
+    EXPIRY_MARGIN = 300
+
+    def __init__(self, path: Optional[str] = None):
+        """初始化cookie存储，文件存在时加载已保存的cookie
+
+        Args:
+            path: cookie文件路径，None 表示只保存在内存中
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # cookie名 -> {'value': 值, 'expires': 过期时间戳}
+        self._cookies: Dict[str, Dict[str, float]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._cookies = json.load(f)
+            except (OSError, ValueError):
+                # 文件损坏时当作没有缓存，重新获取即可
+                self._cookies = {}
+
+    @classmethod
+    def _morsel_expires(cls, morsel: Morsel, now: float) -> float:
+        """解析cookie的过期时间
+
+        Args:
+            morsel: 响应中的cookie
+            now: 当前时间戳
+
+        Returns:
+            过期时间戳
+        """
+        max_age = morsel.get('max-age')
+        if max_age and str(max_age).lstrip('-').isdigit():
+            return now + int(max_age)
+        expires = morsel.get('expires')
+        if expires:
+            timestamp = http2time(expires)
+            if timestamp is not None:
+                return timestamp
+        return now + cls.DEFAULT_TTL
+
+    def update(self, morsels: Iterable[Morsel]):
+        """保存响应中的cookie并写入文件
+
+        Args:
+            morsels: 响应中的cookie，例如 response.cookies.values()
+        """
+        now = time.time()
+        with self._lock:
+            for morsel in morsels:
+                self._cookies[morsel.key] = {
+                    'value': morsel.value,
+                    'expires': self._morsel_expires(morsel, now),
+                }
+            self._save()
+
+    def set(self, name: str, value: str, expires: Optional[float] = None):
+        """保存单个cookie并写入文件
+
+        Args:
+            name: cookie名
+            value: cookie值
+            expires: 过期时间戳，默认为 DEFAULT_TTL 之后
+        """
+        with self._lock:
+            self._cookies[name] = {
+                'value': value,
+                'expires': expires if expires is not None else time.time() + self.DEFAULT_TTL,
+            }
+            self._save()
+
+    def get(self, name: str) -> Optional[str]:
+        """获取未过期的cookie值
+
+        Args:
+            name: cookie名
+
+        Returns:
+            cookie值，不存在或已过期时返回None
+        """
+        cookie = self._cookies.get(name)
+        if cookie and cookie['expires'] - self.EXPIRY_MARGIN > time.time():
+            return cookie['value']
+        return None
+
+    def is_valid(self) -> bool:
+        """判断是否持有可用的访客身份（必需的cookie都存在且未过期）
+
+        Returns:
+            可用返回True
+        """
+        return all(self.get(name) for name in self.REQUIRED_COOKIES)
+
+    def get_cookie_string(self) -> Optional[str]:
+        """获取请求头使用的cookie字符串
+
+        Returns:
+            形如 "SUB=...; SUBP=..." 的字符串，访客身份不可用时返回None
+        """
+        if not self.is_valid():
+            return None
+        now = time.time()
+        return '; '.join(
+            f"{name}={cookie['value']}"
+            for name, cookie in self._cookies.items()
+            if cookie['expires'] - self.EXPIRY_MARGIN > now
+        )
+
+    def clear(self):
+        """清空cookie（访客身份失效时使用）"""
+        with self._lock:
+            self._cookies = {}
+            self._save()
+
+    def dump(self) -> Dict[str, Dict[str, float]]:
+        """导出全部cookie（用于在多个节点间共享访客身份）
+
+        Returns:
+            cookie名 -> {'value': 值, 'expires': 过期时间戳}
+        """
+        with self._lock:
+            return {name: dict(cookie) for name, cookie in self._cookies.items()}
+
+    def load(self, cookies: Dict[str, Dict[str, float]]):
+        """替换为 dump() 导出的cookie并写入文件
+
+        Args:
+            cookies: dump() 的返回值
+        """
+        with self._lock:
+            self._cookies = {name: dict(cookie) for name, cookie in cookies.items()}
+            self._save()
+
+    def _save(self):
+        """原子地写入cookie文件（未指定路径时不写入）"""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cookies, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
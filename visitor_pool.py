@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+访客身份池
+微博按访客身份限流，持有多个访客身份并将请求分散到最久未使用、限流最少的身份上，
+身份连续被限流时自动作废，下次使用时重新获取；
+aiohttp 会把会话 CookieJar 中的cookie合并到显式的 cookie 请求头之上，
+获取身份的请求使用不保存cookie的会话，避免最后获取的身份覆盖其他身份的请求
+"""
+import os
+import re
+import json
+import time
+import uuid
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+import aiohttp
+
+from visitor_cookie import VisitorCookieJar
+from circuit_breaker import CircuitBreaker
+from weibo_errors import WeiboError, CookieError
+
+
+# 获取访客身份的 genvisitor2 接口（与 lite_gen_visitor_cookie.py / gen_visitor_cookie.py 一致）
+GENVISITOR_ENDPOINTS = (
+    'https://visitor.passport.weibo.cn/visitor/genvisitor2',
+    'https://passport.weibo.com/visitor/genvisitor2',
+)
+
+
+@asynccontextmanager
+async def private_session(session: aiohttp.ClientSession) -> AsyncIterator[aiohttp.ClientSession]:
+    """获取不保存cookie的会话，与 session 共用连接池
+
+    Args:
+        session: 调用方的 aiohttp 会话
+
+    Yields:
+        session 本身已使用 DummyCookieJar 时直接返回，否则为新建的会话
+    """
+    if isinstance(session.cookie_jar, aiohttp.DummyCookieJar):
+        yield session
+        return
+    async with aiohttp.ClientSession(
+        connector=session.connector,
+        connector_owner=False,
+        cookie_jar=aiohttp.DummyCookieJar(),
+        timeout=session.timeout,
+        trust_env=session.trust_env,
+    ) as private:
+        yield private
+
+
+class VisitorIdentity:
+    """访客身份及其使用统计"""
+
+    def __init__(self, jar: VisitorCookieJar, endpoint: int):
+        """初始化访客身份
+
+        Args:
+            jar: 保存该身份cookie的存储
+            endpoint: 获取该身份使用的 GENVISITOR_ENDPOINTS 序号
+        """
+        self.jar = jar
+        self.endpoint = endpoint
+        self.last_used = 0.0
+        # 连续被限流的次数，请求成功后清零
+        self.strikes = 0
+        # 当前身份累计被限流的次数
+        self.throttled = 0
+        self.lock = asyncio.Lock()
+
+
+class VisitorPool:
+    """访客身份池"""
+
+    # 表示被限流的状态码
+    THROTTLE_STATUSES = (418, 429)
+
+    # 连续被限流达到该次数后作废身份
+    RETIRE_AFTER = 2
+
+    def __init__(self, jars: List[VisitorCookieJar], breaker: Optional[CircuitBreaker] = None):
+        """初始化访客身份池
+
+        Args:
+            jars: 各身份的cookie存储，身份按序号交替使用两个 genvisitor2 接口获取
+            breaker: genvisitor2 接口的熔断器，默认新建
+        """
+        if not jars:
+            raise ValueError("访客身份池至少需要一个身份")
+        self.identities = [
+            VisitorIdentity(jar, index % len(GENVISITOR_ENDPOINTS))
+            for index, jar in enumerate(jars)
+        ]
+        self.retired = 0
+        self.breaker = breaker or CircuitBreaker('passport')
+
+    @classmethod
+    def create(cls, size: int = 1, path: Optional[str] = None) -> 'VisitorPool':
+        """创建指定大小的访客身份池
+
+        Args:
+            size: 身份数量
+            path: cookie文件路径，第 i 个身份（i > 0）保存到 {文件名}.{i}{扩展名}；
+                None 表示只保存在内存中
+
+        Returns:
+            访客身份池
+        """
+        jars = []
+        for index in range(size):
+            jar_path = path
+            if path and index:
+                root, ext = os.path.splitext(path)
+                jar_path = f"{root}.{index}{ext}"
+            jars.append(VisitorCookieJar(jar_path))
+        return cls(jars)
+
+    async def _mint(self, session: aiohttp.ClientSession, identity: VisitorIdentity):
+        """通过 genvisitor2 获取新的访客身份
+
+        Args:
+            session: aiohttp 会话
+            identity: 需要获取cookie的身份
+
+        Raises:
+            CookieError: 获取失败（包括连接失败、超时和无法解析的回调数据）
+            CircuitOpenError: genvisitor2 接口熔断中
+        """
+        try:
+            await self._request_visitor(session, identity)
+        except WeiboError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise CookieError(f"获取cookie失败: {e!r}") from e
+        if not identity.jar.is_valid():
+            raise CookieError("获取cookie失败：响应中未包含cookie")
+        identity.strikes = 0
+        identity.throttled = 0
+
+    async def _request_visitor(self, session: aiohttp.ClientSession, identity: VisitorIdentity):
+        """请求 genvisitor2 接口，将返回的cookie保存到身份中
+
+        Args:
+            session: aiohttp 会话
+            identity: 需要获取cookie的身份
+
+        Raises:
+            CookieError: 接口返回错误状态码
+            CircuitOpenError: genvisitor2 接口熔断中
+        """
+        url = GENVISITOR_ENDPOINTS[identity.endpoint]
+        headers = {
+            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        }
+        if 'passport.weibo.com' in url:
+            data = {
+                'cb': 'visitor_gray_callback',
+                'ver': '20250916',
+                'request_id': uuid.uuid4().hex,
+                'tid': '',
+                'from': 'weibo',
+                'webdriver': 'false',
+            }
+        else:
+            headers['content-type'] = 'application/x-www-form-urlencoded'
+            data = {'cb': 'visitor_gray_callback'}
+
+        async with self.breaker.request(), private_session(session) as private:
+            async with private.post(url, headers=headers, data=data) as response:
+                if response.status != 200:
+                    raise CookieError(f"获取cookie失败，状态码: {response.status}", response.status)
+                identity.jar.update(response.cookies.values())
+
+                # 部分接口只在回调数据中返回 sub / subp
+                if not identity.jar.is_valid():
+                    match = re.search(r'visitor_gray_callback\((.*)\)', await response.text())
+                    result = json.loads(match.group(1)) if match else {}
+                    visitor_data = result.get('data') or {}
+                    if visitor_data.get('sub'):
+                        identity.jar.set('SUB', visitor_data['sub'])
+                    if visitor_data.get('subp'):
+                        identity.jar.set('SUBP', visitor_data['subp'])
+
+    async def acquire(self, session: aiohttp.ClientSession, prefer_ready: bool = False) -> VisitorCookieJar:
+        """选择一个访客身份，优先连续限流次数最少、其次最久未使用的身份，身份无效时先重新获取
+
+        Args:
+            session: aiohttp 会话
+            prefer_ready: 只要有可用身份就不选择需要重新获取的身份（交互请求不等待 genvisitor2）
+
+        Returns:
+            所选身份的cookie存储
+
+        Raises:
+            CookieError: 获取访客身份失败
+            CircuitOpenError: genvisitor2 接口熔断中
+        """
+        candidates = self.identities
+        if prefer_ready:
+            candidates = [item for item in self.identities if item.jar.is_valid()] or self.identities
+        identity = min(candidates, key=lambda item: (item.strikes, item.last_used))
+        identity.last_used = time.monotonic()
+        if not identity.jar.is_valid():
+            async with identity.lock:
+                # 等待锁期间可能已由其他请求获取
+                if not identity.jar.is_valid():
+                    await self._mint(session, identity)
+        return identity.jar
+
+    def find(self, cookies: str) -> Optional[VisitorIdentity]:
+        """根据请求使用的cookie字符串查找所属身份
+
+        Args:
+            cookies: cookie字符串
+
+        Returns:
+            所属身份，身份已被作废或不属于本池时返回None
+        """
+        sub = None
+        for cookie_item in cookies.split('; '):
+            if cookie_item.startswith('SUB='):
+                sub = cookie_item.split('=', 1)[1]
+                break
+        return next((item for item in self.identities if sub and item.jar.get('SUB') == sub), None)
+
+    def report(self, cookies: str, status: int):
+        """记录使用某个身份的请求结果，连续被限流的身份会被作废
+
+        Args:
+            cookies: 请求使用的cookie字符串
+            status: 响应状态码
+        """
+        identity = self.find(cookies)
+        if identity is None:
+            # 身份已被作废或不属于本池
+            return
+
+        if status not in self.THROTTLE_STATUSES:
+            identity.strikes = 0
+            return
+        identity.strikes += 1
+        identity.throttled += 1
+        if identity.strikes >= self.RETIRE_AFTER:
+            self._retire(identity)
+
+    def _retire(self, identity: VisitorIdentity):
+        """作废身份，下次选中时改用另一个 genvisitor2 接口重新获取
+
+        Args:
+            identity: 被限流的身份
+        """
+        identity.jar.clear()
+        identity.strikes = 0
+        identity.throttled = 0
+        identity.endpoint = (identity.endpoint + 1) % len(GENVISITOR_ENDPOINTS)
+        self.retired += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取身份池统计信息
+
+        Returns:
+            统计字典，包含:
+            - identities: 各身份的 endpoint（接口URL）、valid（是否可用）、strikes、throttled
+            - retired: 累计作废的身份数
+        """
+        return {
+            'identities': [
+                {
+                    'endpoint': GENVISITOR_ENDPOINTS[identity.endpoint],
+                    'valid': identity.jar.is_valid(),
+                    'strikes': identity.strikes,
+                    'throttled': identity.throttled,
+                }
+                for identity in self.identities
+            ],
+            'retired': self.retired,
+        }
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+微博媒体下载器
+统一下载 WeiboParser 解析结果中的媒体文件，weibo.com / m.weibo.cn / video.weibo.com
+三种链接共用同一个会话、同一份访客cookie和同一条下载路径
+"""
+import os
+import asyncio
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from weibo_parser import WeiboParser
+from media_store import MediaStore
+from download_scheduler import DownloadScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+from visitor_cookie import VisitorCookieJar, DEFAULT_COOKIE_FILE
+
+
+class WeiboDownloader:
+    """微博媒体下载器"""
+
+    def __init__(
+        self,
+        parser: Optional[WeiboParser] = None,
+        store: Optional[MediaStore] = None,
+        scheduler: Optional[DownloadScheduler] = None,
+        revalidate: bool = False
+    ):
+        """初始化下载器
+
+        Args:
+            parser: 微博解析器，默认新建
+            store: 媒体存储，默认使用当前目录下的 media_store
+            scheduler: 下载调度器，默认新建；多个下载器可共享同一个调度器
+            revalidate: 已存储的媒体也通过 ETag / Last-Modified 条件请求向CDN确认是否有更新
+        """
+        self.parser = parser or WeiboParser()
+        self.store = store or MediaStore('media_store')
+        self.scheduler = scheduler or DownloadScheduler()
+        self.revalidate = revalidate
+
+    def _build_headers(self, post_url: str) -> Dict[str, str]:
+        """构建下载请求头，referer 与微博链接所属站点一致
+
+        Args:
+            post_url: 微博链接
+
+        Returns:
+            请求头字典
+        """
+        host = urlparse(post_url).hostname or ''
+        referer = 'https://m.weibo.cn/' if host == 'm.weibo.cn' else 'https://weibo.com/'
+        return {
+            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36 Edg/142.0.0.0',
+            'referer': referer,
+        }
+
+    def _build_filename(self, media_url: str, index: int) -> Tuple[str, str]:
+        """根据媒体URL生成文件名
+
+        Args:
+            media_url: 媒体直链
+            index: 文件序号（从1开始）
+
+        Returns:
+            (文件名, 扩展名)
+        """
+        parsed = urlparse(media_url)
+        ext = os.path.splitext(parsed.path)[1]
+        is_video = ext == '.mp4' or 'video' in (parsed.hostname or '')
+
+        # 如果没有扩展名，根据媒体类型和 URL 判断
+        if not ext:
+            if is_video or '.mp4' in media_url.lower():
+                ext = '.mp4'
+            elif '.gif' in media_url.lower():
+                ext = '.gif'
+            else:
+                ext = '.jpg'
+
+        media_type = 'video' if is_video else 'image'
+        return f"{media_type}_{index:03d}{ext}", ext
+
+    def default_save_dir(self, post_url: str) -> str:
+        """获取微博的默认保存目录
+
+        Args:
+            post_url: 微博链接
+
+        Returns:
+            保存目录，格式为 downloads_{微博ID}
+        """
+        return f"downloads_{self.parser.get_post_id(post_url).replace(':', '_')}"
+
+    async def _download_one(
+        self,
+        session: aiohttp.ClientSession,
+        media_url: str,
+        filepath: str,
+        ext: str,
+        headers: Dict[str, str],
+        priority: int,
+        group: str
+    ) -> Dict[str, Any]:
+        """下载单个媒体文件到保存目录
+
+        Args:
+            session: aiohttp 会话
+            media_url: 媒体直链
+            filepath: 保存路径
+            ext: 文件扩展名
+            headers: 请求头
+            priority: 调度优先级
+            group: 调度公平分组
+
+        Returns:
+            下载结果字典: url, path（失败时为None）, fetched（是否实际发生了下载）
+        """
+        blob_path, fetched = await self.store.fetch(
+            session, media_url, headers, ext, self.scheduler, priority, group, self.revalidate
+        )
+        if blob_path is None:
+            return {'url': media_url, 'path': None, 'fetched': fetched}
+        self.store.link(blob_path, filepath)
+        return {'url': media_url, 'path': filepath, 'fetched': fetched}
+
+    async def download(
+        self,
+        session: aiohttp.ClientSession,
+        result: Dict[str, Any],
+        save_dir: Optional[str] = None,
+        priority: int = PRIORITY_BACKFILL
+    ) -> List[Dict[str, Any]]:
+        """下载解析结果中的全部媒体文件
+
+        Args:
+            session: aiohttp 会话
+            result: WeiboParser.parse() 的解析结果
+            save_dir: 保存目录，默认为 downloads_{微博ID}
+            priority: 调度优先级
+
+        Returns:
+            每个媒体文件的下载结果列表，顺序与 media_urls 一致
+        """
+        post_url = result['url']
+        save_dir = save_dir or self.default_save_dir(post_url)
+        os.makedirs(save_dir, exist_ok=True)
+        headers = self._build_headers(post_url)
+
+        tasks = []
+        for index, media_url in enumerate(result['media_urls'], 1):
+            filename, ext = self._build_filename(media_url, index)
+            tasks.append(self._download_one(
+                session, media_url, os.path.join(save_dir, filename), ext, headers, priority, save_dir
+            ))
+        return list(await asyncio.gather(*tasks))
+
+    async def download_url(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        save_dir: Optional[str] = None,
+        priority: int = PRIORITY_BACKFILL
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """解析微博链接并下载全部媒体文件
+
+        Args:
+            session: aiohttp 会话
+            url: 微博链接（weibo.com / m.weibo.cn / video.weibo.com / t.cn 短链接）
+            save_dir: 保存目录，默认为 downloads_{微博ID}
+            priority: 优先级，同时用于解析和下载
+
+        Returns:
+            (解析结果, 下载结果列表)
+
+        Raises:
+            Exception: 解析失败
+        """
+        result = await self.parser.parse(session, url, priority=priority)
+        return result, await self.download(session, result, save_dir, priority)
+
+
+async def run_cli(title: str, prompt: str):
+    """命令行下载入口，供各站点的下载脚本复用
+
+    Args:
+        title: 工具标题
+        prompt: 输入提示
+    """
+    print("=" * 60)
+    print(title)
+    print("=" * 60)
+
+    # 获取用户输入的 URL
+    weibo_url = input(f"\n{prompt}").strip()
+
+    if not weibo_url:
+        print("错误: URL 不能为空")
+        return
+
+    # 复用上次运行保存的访客cookie，避免每次启动都重新获取
+    downloader = WeiboDownloader(WeiboParser(VisitorCookieJar(DEFAULT_COOKIE_FILE)))
+    try:
+        async with aiohttp.ClientSession() as session:
+            print("\n[步骤 1] 解析微博数据...")
+            result, downloads = await downloader.download_url(session, weibo_url, priority=PRIORITY_INTERACTIVE)
+
+            print(f"  找到 {len(result['media_urls'])} 个媒体文件:")
+            for i, media_url in enumerate(result['media_urls'], 1):
+                print(f"    {i}. {media_url[:80]}...")
+
+            print("\n[步骤 2] 下载媒体文件...")
+            for download in downloads:
+                if download['path'] is None:
+                    print(f"  ✗ 下载失败: {download['url']}")
+                else:
+                    status = '下载成功' if download['fetched'] else '已存储，跳过下载'
+                    print(f"  ✓ {status}: {download['path']}")
+
+        print("\n" + "=" * 60)
+        print("完成！")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n错误: {str(e)}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+解析器异常类型
+所有解析失败都抛出 WeiboError 的子类，retryable 属性区分临时性失败（可以重试）
+和永久性失败（微博已删除、没有媒体等，重试只会浪费上游配额）；
+aiohttp 的连接错误和超时在调用边界转换为 NetworkError
+"""
+import asyncio
+from contextlib import contextmanager
+from typing import Optional, Iterator
+
+import aiohttp
+
+
+class WeiboError(Exception):
+    """解析失败"""
+
+    # 是否为临时性失败
+    retryable = False
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        """初始化异常
+
+        Args:
+            message: 错误信息
+            status: 上游响应状态码（如果有）
+        """
+        super().__init__(message)
+        self.status = status
+
+
+class CookieError(WeiboError):
+    """获取访客cookie失败"""
+
+    retryable = True
+
+
+class ThrottledError(WeiboError):
+    """访客身份被限流（418 / 429）"""
+
+    retryable = True
+
+
+class NotFoundError(WeiboError):
+    """微博不存在、已删除或无权查看"""
+
+
+class NoMediaError(WeiboError):
+    """微博中没有媒体文件"""
+
+
+class UpstreamError(WeiboError):
+    """上游服务错误（5xx）"""
+
+    retryable = True
+
+
+class NetworkError(WeiboError):
+    """连接上游失败或等待响应超时（没有收到响应）"""
+
+    retryable = True
+
+
+class DecodeError(WeiboError):
+    """响应内容无法解析（结构变化或返回了非预期的页面）"""
+
+
+class StageTimeoutError(WeiboError, asyncio.TimeoutError):
+    """解析的某个阶段耗尽了调用的时间预算"""
+
+    retryable = True
+
+    def __init__(self, stage: str, timeout: float):
+        """初始化超时异常
+
+        Args:
+            stage: 超时的阶段（resolve / queue / cookie / xsrf / request / body）
+            timeout: 调用的总时间预算（秒）
+        """
+        super().__init__(f"解析超时：{stage} 阶段耗尽了 {timeout:g} 秒的时间预算")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class CircuitOpenError(WeiboError):
+    """上游接口的熔断器已打开，请求未发出"""
+
+    retryable = True
+
+    def __init__(self, endpoint: str, retry_after: float):
+        """初始化熔断异常
+
+        Args:
+            endpoint: 上游接口名称（passport / ajax / mobile / tv）
+            retry_after: 距离熔断器放行探测请求的秒数
+        """
+        super().__init__(f"{endpoint} 接口暂不可用（熔断中），{retry_after:.1f} 秒后重试")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+@contextmanager
+def wrap_network_errors(message: str) -> Iterator[None]:
+    """将作用域内 aiohttp 的连接错误和超时转换为 NetworkError，WeiboError 原样抛出
+
+    Args:
+        message: 错误信息前缀
+
+    Raises:
+        NetworkError: 连接失败或超时
+    """
+    try:
+        yield
+    except WeiboError:
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise NetworkError(f"{message}: {e!r}") from e
+
+
+def error_for_status(status: int, message: str) -> WeiboError:
+    """根据上游响应状态码生成对应类型的异常
+
+    Args:
+        status: 响应状态码
+        message: 错误信息
+
+    Returns:
+        ThrottledError（418 / 429）、NotFoundError（404）、UpstreamError（5xx）或 WeiboError
+    """
+    if status in (418, 429):
+        return ThrottledError(message, status)
+    if status == 404:
+        return NotFoundError(message, status)
+    if status >= 500:
+        return UpstreamError(message, status)
+    return WeiboError(message, status)
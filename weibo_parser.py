@@ -5,18 +5,132 @@
 """
 import re
 import json
-from typing import Optional, Dict, Any, List
+import codecs
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Iterator, FrozenSet, Tuple, AsyncIterator, Union, IO
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 
 import aiohttp
 
-from base_parser import BaseVideoParser
+from base_parser import BaseVideoParser, WEIBO_HOSTS
+from checkpoint_store import TimelineCheckpointStore
+from visitor_cookie import VisitorCookieJar
+from visitor_pool import VisitorPool, private_session
+from adaptive_limiter import AdaptiveLimiter
+from circuit_breaker import CircuitBreaker, STATE_CLOSED
+from link_resolver import ShortLinkResolver
+from download_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BACKFILL
+from deadline import deadline_scope, run_stage, stage_context
+from retry_policy import RetryPolicy
+from weibo_errors import NoMediaError, NotFoundError, DecodeError, error_for_status, wrap_network_errors
+
+
+class MediaPolicy:
+    """媒体清晰度选择策略，决定 media_urls 中填入哪个视频版本和图片尺寸"""
+
+    # 图片尺寸从小到大排列
+    IMAGE_SIZES = ('thumbnail', 'bmiddle', 'large', 'original', 'largest')
+
+    def __init__(
+        self,
+        max_height: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        image_size: str = 'largest'
+    ):
+        """初始化媒体选择策略
+
+        Args:
+            max_height: 视频分辨率上限（按短边比较，720 表示最高选择 720P，竖屏视频同样适用）
+            max_bytes: 视频文件大小上限（字节），只对已知大小的版本生效
+            image_size: 图片尺寸，取自 IMAGE_SIZES，例如预览场景使用 'bmiddle' 或 'thumbnail'
+
+        Raises:
+            ValueError: 未知的图片尺寸
+        """
+        if image_size not in self.IMAGE_SIZES:
+            raise ValueError(f"未知的图片尺寸: {image_size}")
+        self.max_height = max_height
+        self.max_bytes = max_bytes
+        self.image_size = image_size
+
+    @staticmethod
+    def video_resolution(variant: Dict[str, Any]) -> Optional[int]:
+        """获取视频版本的分辨率（短边）
+
+        宽高都已知时取短边；只知道其中一个时（如 video_details 只提供清晰度 "720"）直接使用该值
+
+        Args:
+            variant: 视频版本字典
+
+        Returns:
+            分辨率，宽高都未知时返回None
+        """
+        width, height = variant.get('width'), variant.get('height')
+        if width and height:
+            return min(width, height)
+        return width or height or None
+
+    def _video_fits(self, variant: Dict[str, Any]) -> bool:
+        """判断视频版本是否满足限制，未知的指标视为满足
+
+        Args:
+            variant: 视频版本字典
+
+        Returns:
+            满足限制返回True
+        """
+        resolution = self.video_resolution(variant)
+        if self.max_height and resolution:
+            if resolution > self.max_height:
+                return False
+        if self.max_bytes and variant.get('size'):
+            if variant['size'] > self.max_bytes:
+                return False
+        return True
+
+    def select_video(self, variants: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """从视频版本列表中选择满足限制的最高画质版本
+
+        Args:
+            variants: 视频版本列表（按画质从高到低排序）
+
+        Returns:
+            选中的版本；没有版本满足限制时返回画质最低的版本，列表为空时返回None
+        """
+        if not variants:
+            return None
+        for variant in variants:
+            if self._video_fits(variant):
+                return variant
+        return variants[-1]
+
+    def select_image(self, renditions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """从图片尺寸列表中选择指定尺寸
+
+        指定尺寸不存在时依次尝试更大的尺寸，再依次尝试更小的尺寸
+
+        Args:
+            renditions: 图片尺寸列表
+
+        Returns:
+            选中的尺寸，列表为空时返回None
+        """
+        by_name = {rendition['name']: rendition for rendition in renditions}
+        index = self.IMAGE_SIZES.index(self.image_size)
+        for name in self.IMAGE_SIZES[index:] + self.IMAGE_SIZES[:index][::-1]:
+            if name in by_name:
+                return by_name[name]
+        return renditions[0] if renditions else None
 
 
 class WeiboParser(BaseVideoParser):
     """微博解析器"""
 
+    # 负责的域名，与 base_parser.registry 中的注册共用同一份列表
+    HOSTS = WEIBO_HOSTS
+
     # URL匹配模式（统一管理，避免重复定义）
     URL_PATTERNS = {
         'weibo_com': [
@@ -32,9 +146,112 @@ class WeiboParser(BaseVideoParser):
         ],
     }
 
-    def __init__(self):
-        """初始化微博解析器"""
+    # 需要跟随跳转才能得到微博链接的短链接和分享页链接
+    SHORT_LINK_PATTERNS = [
+        r'(?:^|//)t\.cn/[A-Za-z0-9]+',
+        r'(?:^|//)sinaurl\.cn/[A-Za-z0-9]+',
+        r'(?:share|mapp)\.api\.weibo\.cn/',
+    ]
+
+    # 文本中的微博链接，合并为一个正则只扫描一遍（公共前缀 http 便于正则引擎快速跳过无关文本）
+    LINK_REGEX = re.compile(
+        r'https?://(?:'
+        r'weibo\.com/(?:\d+/[A-Za-z0-9]+|tv/show/[\d:]+)'
+        r'|weibo\.cn/status/\d+'
+        r'|m\.weibo\.cn/detail/\d+'
+        r'|video\.weibo\.com/show\?fid=[\d:]+'
+        r'|(?:t|sinaurl)\.cn/[A-Za-z0-9]+'
+        r')'
+    )
+
+    # 链接中一定包含的域名片段，先用字符串查找定位，只在命中位置附近运行正则
+    LINK_LITERALS = ('weibo.com', 'weibo.cn', 't.cn/', 'sinaurl.cn/')
+
+    # 域名片段之前最多的字符数（"https://video."）
+    LINK_LITERAL_OFFSET = len('https://video.')
+
+    # 流式提取时块末尾保留到下一块的字符数，大于一个完整链接的长度
+    LINK_CARRY = 256
+
+    # 解析结果包含的全部字段，parse() 的 fields 参数只能从中选择
+    RESULT_FIELDS = (
+        'url', 'media_type', 'title', 'author', 'desc', 'timestamp', 'video_size', 'media_urls',
+        'video_variants', 'image_renditions', 'retweeted',
+    )
+
+    # media_info 中可能出现的视频链接字段，按画质从高到低排列
+    MEDIA_INFO_VIDEO_KEYS = (
+        'mp4_1080p_mp4', 'mp4_720p_mp4', 'hd_url', 'mp4_hd_url', 'stream_url_hd',
+        'mp4_hd_mp4', 'mp4_sd_url', 'stream_url', 'mp4_ld_mp4',
+    )
+
+    # 响应体超过该大小（字节）时，解码和后处理移出事件循环，避免阻塞其他并发解析
+    OFFLOAD_THRESHOLD = 256 * 1024
+
+    # 短ID（如 QdC5HtUjg）使用的 base62 字母表
+    BASE62_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+    def __init__(
+        self,
+        cookie_jar: Optional[VisitorCookieJar] = None,
+        visitor_pool: Optional[VisitorPool] = None,
+        executor: Optional[Executor] = None,
+        offload_threshold: Optional[int] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        link_resolver: Optional[ShortLinkResolver] = None
+    ):
+        """初始化微博解析器
+
+        Args:
+            cookie_jar: 访客cookie存储，默认只在内存中缓存；
+                传入 VisitorCookieJar(path) 可在重启后复用已获取的访客身份
+            visitor_pool: 访客身份池，指定时忽略 cookie_jar，
+                例如 VisitorPool.create(4, path) 将请求分散到4个访客身份上
+            executor: 处理超大响应（JSON解码、媒体提取、文本清理）的线程池或进程池，
+                默认使用事件循环的默认线程池；使用进程池时子进程按 type(self)() 创建解析器，
+                子类需要能够不带参数构造
+            offload_threshold: 响应体超过该大小（字节）时交给 executor 处理，默认为 OFFLOAD_THRESHOLD
+            limiter: 上游请求的自适应并发限制器，默认新建；当前并发上限见 stats()['limiter']
+            retry_policy: parse() 的重试策略，默认最多尝试3次，RetryPolicy(max_attempts=1) 表示不重试
+            link_resolver: t.cn 短链接 / 分享页链接的解析器，默认新建（解析结果缓存7天）
+        """
         super().__init__("weibo")
+        if visitor_pool is None:
+            visitor_pool = VisitorPool([cookie_jar if cookie_jar is not None else VisitorCookieJar()])
+        self.visitor_pool = visitor_pool
+        self.executor = executor
+        self.offload_threshold = offload_threshold if offload_threshold is not None else self.OFFLOAD_THRESHOLD
+        self.limiter = limiter or AdaptiveLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 各上游接口的熔断器，接口持续不可用时直接失败，不再等待超时
+        self.breakers: Dict[str, CircuitBreaker] = {
+            'passport': self.visitor_pool.breaker,
+            'ajax': CircuitBreaker('ajax'),
+            'mobile': CircuitBreaker('mobile'),
+            'tv': CircuitBreaker('tv'),
+        }
+        self.link_resolver = link_resolver or ShortLinkResolver(self._is_post_url)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取解析器的运行指标
+
+        Returns:
+            统计字典，包含:
+            - limiter: 并发限制器统计，见 AdaptiveLimiter.stats()
+            - visitor_pool: 访客身份池统计，见 VisitorPool.stats()
+            - breakers: 各上游接口熔断器的统计，见 CircuitBreaker.stats()
+            - open_breakers: 当前未关闭（open / half_open）的熔断器名称
+            - short_links: 短链接缓存统计，见 ShortLinkResolver.stats()
+        """
+        breakers = {name: breaker.stats() for name, breaker in self.breakers.items()}
+        return {
+            'limiter': self.limiter.stats(),
+            'visitor_pool': self.visitor_pool.stats(),
+            'breakers': breakers,
+            'open_breakers': [name for name, item in breakers.items() if item['state'] != STATE_CLOSED],
+            'short_links': self.link_resolver.stats(),
+        }
 
     def can_parse(self, url: str) -> bool:
         """判断是否可以解析此URL
@@ -43,13 +260,61 @@ class WeiboParser(BaseVideoParser):
             url: 微博链接
             
         Returns:
-            如果是微博链接返回True，否则返回False
+            如果是微博链接（包括需要跟随跳转的短链接）返回True，否则返回False
+        """
+        return self._is_post_url(url) or self.is_short_link(url)
+
+    def _is_post_url(self, url: str) -> bool:
+        """判断是否为可直接解析的微博链接（匹配 URL_PATTERNS）
+
+        Args:
+            url: 链接
+
+        Returns:
+            匹配返回True
         """
         all_patterns = []
         for patterns in self.URL_PATTERNS.values():
             all_patterns.extend(patterns)
         return any(re.search(pattern, url) for pattern in all_patterns)
 
+    def is_short_link(self, url: str) -> bool:
+        """判断是否为需要跟随跳转的短链接或分享页链接
+
+        Args:
+            url: 链接
+
+        Returns:
+            是短链接返回True
+        """
+        return not self._is_post_url(url) and any(
+            re.search(pattern, url) for pattern in self.SHORT_LINK_PATTERNS
+        )
+
+    async def resolve_url(self, session: aiohttp.ClientSession, url: str) -> str:
+        """将短链接解析为可直接解析的微博链接，其他链接原样返回
+
+        Args:
+            session: aiohttp 会话
+            url: 链接
+
+        Returns:
+            微博链接（去掉跳转目标附带的查询参数和锚点，视频链接保留 fid 参数）
+
+        Raises:
+            ValueError: 短链接没有指向微博
+            WeiboError: 跟随跳转失败
+        """
+        if not self.is_short_link(url):
+            return url
+        resolved = await self.retry_policy.call(self.link_resolver.resolve, session, url)
+        if not self._is_post_url(resolved):
+            raise ValueError(f"短链接没有指向微博: {url} -> {resolved}")
+        parsed = urlparse(resolved)
+        if self._get_url_type(resolved) == 'video_weibo':
+            return parsed._replace(fragment='').geturl()
+        return parsed._replace(query='', fragment='').geturl()
+
     def extract_links(self, text: str) -> List[str]:
         """从文本中提取微博链接
         
@@ -57,19 +322,117 @@ class WeiboParser(BaseVideoParser):
             text: 输入文本
             
         Returns:
-            提取到的微博链接列表
+            提取到的微博链接列表，按出现顺序排列，同一条微博只保留第一次出现的链接
+        """
+        return list(self.iter_links(text))
+
+    def iter_links(
+        self,
+        source: Union[str, Iterable[Union[str, bytes]], IO],
+        chunk_size: int = 1 << 20
+    ) -> Iterator[str]:
+        """从大文本（导出的聊天记录、抓取的网页等）中流式提取微博链接
+        
+        输入按块处理，块末尾可能被截断的链接与下一块拼接后再匹配，内存占用与输入大小无关
+        
+        Args:
+            source: 文本、文本块的可迭代对象（如逐行迭代的文件），或带 read() 方法的文件对象；
+                字节块按 UTF-8 解码
+            chunk_size: 从文件对象读取时每块的大小
+            
+        Yields:
+            微博链接，按出现顺序，同一条微博（规范化ID相同）的不同链接形式只返回第一次出现的
+        """
+        if isinstance(source, (str, bytes)):
+            chunks = [source]
+        elif hasattr(source, 'read'):
+            # 文本文件读到末尾返回 ''，二进制文件返回 b''
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+        else:
+            chunks = source
+        
+        seen = set()
+        for link in self._iter_link_matches(chunks):
+            key = self._link_key(link)
+            if key not in seen:
+                seen.add(key)
+                yield link
+
+    def _iter_link_matches(self, chunks: Iterable[Union[str, bytes]]) -> Iterator[str]:
+        """逐块匹配微博链接（不去重）
+        
+        Args:
+            chunks: 文本块或字节块
+            
+        Yields:
+            微博链接，按出现顺序
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        carry = ''
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk)
+            buffer = carry + chunk
+            links, keep = self._scan_links(buffer, final=False)
+            carry = buffer[keep:]
+            yield from links
+        
+        links, _ = self._scan_links(carry + decoder.decode(b'', final=True), final=True)
+        yield from links
+
+    def _scan_links(self, text: str, final: bool) -> Tuple[List[str], int]:
+        """在一块文本中查找完整的微博链接
+        
+        Args:
+            text: 上一块保留的末尾加上当前块
+            final: 是否为最后一块（末尾的链接不会再延续）
+            
+        Returns:
+            (链接列表, 需要保留到下一块的起始位置)
         """
-        patterns = [
-            r'https?://weibo\.com/\d+/[A-Za-z0-9]+',
-            r'https?://weibo\.cn/status/\d+',
-            r'https?://m\.weibo\.cn/detail/\d+',
-            r'https?://video\.weibo\.com/show\?fid=[\d:]+',
-            r'https?://weibo\.com/tv/show/[\d:]+',
-        ]
         links = []
-        for pattern in patterns:
-            links.extend(re.findall(pattern, text))
-        return list(set(links))
+        pos = 0
+        pending = None
+        # 各域名片段下一次出现的位置（-1 表示之后不再出现），只在落后于 pos 时重新查找，
+        # 避免每找到一个链接都把文本扫描到末尾
+        hits: Dict[str, Optional[int]] = dict.fromkeys(self.LINK_LITERALS)
+        while True:
+            for literal, index in hits.items():
+                if index is None or 0 <= index < pos:
+                    hits[literal] = text.find(literal, pos)
+            found = [index for index in hits.values() if index >= 0]
+            if not found:
+                break
+            match = self.LINK_REGEX.search(text, max(pos, min(found) - self.LINK_LITERAL_OFFSET))
+            if match is None:
+                break
+            if not final and match.end() == len(text) and match.start() >= len(text) - self.LINK_CARRY:
+                # 链接到达块末尾，可能在下一块继续
+                pending = match.start()
+                break
+            links.append(match.group())
+            pos = match.end()
+        
+        if final:
+            return links, len(text)
+        if pending is not None:
+            return links, pending
+        # 保留末尾的字符，其中可能有被截断的链接开头；已匹配的链接不再保留
+        return links, max(pos, len(text) - self.LINK_CARRY)
+
+    def _link_key(self, link: str) -> str:
+        """获取链接的去重键
+        
+        Args:
+            link: 微博链接
+            
+        Returns:
+            规范化微博ID，尚未解析的短链接返回规范化的短链接
+        """
+        try:
+            return self.get_post_id(link)
+        except ValueError:
+            return ShortLinkResolver.normalize(link)
 
     def _get_url_type(self, url: str) -> str:
         """根据URL判断微博链接类型
@@ -105,8 +468,8 @@ class WeiboParser(BaseVideoParser):
             ValueError: 无法提取页面 ID
         """
         # 匹配类似 https://weibo.com/1566936885/5232446897127970 或 https://weibo.com/1566936885/QdC5HtUjg 的 URL
-        # 提取最后一个斜杠后的内容（数字或字母数字组合）
-        match = re.search(r'/([A-Za-z0-9]+)$', url.rstrip('/'))
+        # 提取路径最后一个斜杠后的内容（数字或字母数字组合），忽略 ?refer_flag= 等查询参数和锚点
+        match = re.search(r'/([A-Za-z0-9]+)$', urlparse(url).path.rstrip('/'))
         if match:
             return match.group(1)
         else:
@@ -155,54 +518,205 @@ class WeiboParser(BaseVideoParser):
             else:
                 raise ValueError(f"无法从 URL 中提取视频 ID: {url}")
 
-    async def _get_visitor_cookies(self, session: aiohttp.ClientSession) -> str:
-        """获取微博访客cookie
+    def _mid_to_id(self, mid: str) -> str:
+        """将 base62 短ID转换为数字ID
+
+        短ID从末尾起每4个字符一组，每组按base62解码，除最高位组外补零到7位
+        例如: QdC5HtUjg -> 5232446897127970
+
+        Args:
+            mid: 短ID
+
+        Returns:
+            数字ID
+
+        Raises:
+            ValueError: 包含非base62字符
+        """
+        groups = []
+        for end in range(len(mid), 0, -4):
+            start = max(end - 4, 0)
+            num = 0
+            for char in mid[start:end]:
+                index = self.BASE62_ALPHABET.find(char)
+                if index < 0:
+                    raise ValueError(f"无效的短ID: {mid}")
+                num = num * 62 + index
+            groups.append(str(num).zfill(7) if start > 0 else str(num))
+        return ''.join(reversed(groups))
+
+    def get_post_id(self, url: str) -> str:
+        """获取链接对应的规范化微博ID，同一条微博的不同链接形式返回相同ID
+
+        Args:
+            url: 微博链接；短链接需要先经过 resolve_url()（或 parse()）解析，之后从缓存中读取
+
+        Returns:
+            规范化ID: weibo.com / m.weibo.cn 链接返回数字ID，视频链接返回 "video:{fid}"
+
+        Raises:
+            ValueError: 无法识别的URL、无法提取ID或短链接尚未解析
+        """
+        if self.is_short_link(url):
+            resolved = self.link_resolver.get(url)
+            if resolved is None:
+                raise ValueError(f"短链接尚未解析: {url}")
+            url = resolved
+        url_type = self._get_url_type(url)
+        if url_type == 'weibo_com':
+            page_id = self._extract_page_id(url)
+            return page_id if page_id.isdigit() else self._mid_to_id(page_id)
+        elif url_type == 'm_weibo_cn':
+            return self._extract_blog_id(url)
+        else:
+            return f"video:{self._extract_video_id(url)}"
+
+    async def _get_visitor_cookies(
+        self,
+        session: aiohttp.ClientSession,
+        priority: int = PRIORITY_BACKFILL
+    ) -> str:
+        """从访客身份池中选择一个访客身份，获取其cookie
+        
+        XSRF-TOKEN 只有 weibo.com ajax 接口需要，不在这里获取，
+        由 _refresh_xsrf_token 在接口返回403时按需获取
         
         Args:
             session: aiohttp 会话
+            priority: 优先级，交互请求优先使用已有的访客身份
             
         Returns:
             完整的cookie字符串
             
         Raises:
-            Exception: 获取失败
+            CookieError: 获取失败
         """
-        url = "https://visitor.passport.weibo.cn/visitor/genvisitor2"
+        jar = await self.visitor_pool.acquire(session, prefer_ready=priority <= PRIORITY_INTERACTIVE)
+        return jar.get_cookie_string()
 
-        headers = {
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'content-type': 'application/x-www-form-urlencoded',
-        }
-
-        data = {'cb': 'visitor_gray_callback'}
+    async def _refresh_xsrf_token(self, session: aiohttp.ClientSession, cookies: str) -> str:
+        """访问一次weibo.com页面获取XSRF-TOKEN，保存到所属访客身份中供后续请求复用
+        
+        Args:
+            session: aiohttp 会话
+            cookies: 被拒绝的请求使用的cookie字符串
+            
+        Returns:
+            带有XSRF-TOKEN的cookie字符串，获取失败时返回原cookie字符串
+        """
+        identity = self.visitor_pool.find(cookies)
+        if identity is None:
+            return cookies
+        
+        sent_token = None
+        for cookie_item in cookies.split('; '):
+            if cookie_item.startswith('XSRF-TOKEN='):
+                sent_token = cookie_item.split('=', 1)[1]
+                break
+        
+        async with identity.lock:
+            # 等待锁期间其他请求可能已获取到新的token
+            if identity.jar.get('XSRF-TOKEN') in (None, sent_token):
+                headers = {'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+                # 不保存到调用方会话的 CookieJar，否则会覆盖其他身份请求的 XSRF-TOKEN
+                async with private_session(session) as private:
+                    async with private.get('https://weibo.com', headers=headers) as page_response:
+                        if page_response.status == 200:
+                            # 从响应cookie中获取XSRF-TOKEN
+                            for cookie in page_response.cookies.values():
+                                if cookie.key == 'XSRF-TOKEN':
+                                    identity.jar.update([cookie])
+                                    break
+        
+        return identity.jar.get_cookie_string() or cookies
 
-        async with session.post(url, headers=headers, data=data) as response:
-            if response.status != 200:
-                raise Exception(f"获取cookie失败，状态码: {response.status}")
+    async def _request_ajax(
+        self,
+        session: aiohttp.ClientSession,
+        api_url: str,
+        referer: str,
+        cookies: str,
+        error_prefix: str,
+        priority: int = PRIORITY_BACKFILL
+    ) -> bytes:
+        """请求 weibo.com ajax 接口，返回403时获取XSRF-TOKEN后重试一次
+        
+        Args:
+            session: aiohttp 会话
+            api_url: 接口URL
+            referer: 作为referer的页面URL
+            cookies: cookie 字符串
+            error_prefix: 错误信息前缀
+            priority: 优先级
             
-            # 获取响应中的所有cookie并格式化为字符串
-            cookies = []
-            for cookie in response.cookies.values():
-                cookies.append(f"{cookie.key}={cookie.value}")
+        Returns:
+            响应体（由 _load_ajax_json 解码）
             
-            if not cookies:
-                raise Exception("获取cookie失败：响应中未包含cookie")
+        Raises:
+            WeiboError: 请求失败，按状态码为 ThrottledError / NotFoundError / UpstreamError 等
+        """
+        async with self.breakers['ajax'].request():
+            for attempt in range(2):
+                headers = self._build_ajax_headers(referer, cookies)
+                async with stage_context('queue', self.limiter.request(priority, 'ajax')) as call:
+                    async with stage_context('request', session.get(api_url, headers=headers)) as response:
+                        call.status = response.status
+                        self.visitor_pool.report(cookies, response.status)
+                        if response.status == 200:
+                            return await run_stage('body', response.read())
+                        
+                        if response.status != 403 or attempt:
+                            text = await run_stage('body', response.text())
+                            raise error_for_status(
+                                response.status, f"{error_prefix}，状态码: {response.status}, 响应: {text[:200]}"
+                            )
+
+                # 缺少或过期的XSRF-TOKEN会导致403
+                cookies = await run_stage('xsrf', self._refresh_xsrf_token(session, cookies))
+
+    def _load_ajax_json(self, body: bytes, error_prefix: str) -> Dict[str, Any]:
+        """解码 weibo.com ajax 接口的响应体
+        
+        Args:
+            body: 响应体
+            error_prefix: 错误信息前缀
             
-            cookie_str = '; '.join(cookies)
+        Returns:
+            接口返回的JSON数据
             
-            # 检查是否有XSRF-TOKEN，如果没有则访问一次weibo.com页面获取
-            if 'XSRF-TOKEN' not in cookie_str:
-                # 访问weibo.com首页获取XSRF-TOKEN
-                async with session.get('https://weibo.com', headers={'user-agent': headers['user-agent']}) as page_response:
-                    if page_response.status == 200:
-                        # 从响应cookie中获取XSRF-TOKEN
-                        for cookie in page_response.cookies.values():
-                            if cookie.key == 'XSRF-TOKEN':
-                                cookies.append(f"{cookie.key}={cookie.value}")
-                                cookie_str = '; '.join(cookies)
-                                break
+        Raises:
+            DecodeError: 响应不是JSON
+            NotFoundError: 接口返回错误（微博不存在、已删除或无权查看）
+        """
+        try:
+            json_data = json.loads(body)
+        except ValueError as e:
+            raise DecodeError(f"{error_prefix}: 解析 JSON 失败: {str(e)}")
+        
+        # 检查API是否返回错误
+        if json_data.get('ok') == 0:
+            error_msg = json_data.get('msg', '未知错误')
+            raise NotFoundError(f"{error_prefix}: {error_msg}")
+        return json_data
+
+    async def _offload(self, size: int, method: str, *args: Any) -> Any:
+        """执行解析器的纯计算方法，输入超过 offload_threshold 时交给 executor，避免阻塞事件循环
+        
+        Args:
+            size: 输入大小（字节）
+            method: 方法名
+            *args: 方法参数（使用进程池时需要可序列化）
             
-            return cookie_str
+        Returns:
+            方法的返回值
+        """
+        if size < self.offload_threshold:
+            return getattr(self, method)(*args)
+        loop = asyncio.get_running_loop()
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # 解析器实例持有会话相关的状态，无法传给子进程，由子进程创建同一类型的解析器
+            return await loop.run_in_executor(self.executor, _call_parser_method, type(self), method, *args)
+        return await loop.run_in_executor(self.executor, getattr(self, method), *args)
 
     def _format_author(self, screen_name: str, user_id: str) -> str:
         """格式化作者字段
@@ -248,54 +762,266 @@ class WeiboParser(BaseVideoParser):
             return 'https:' + url
         return url
 
-    def _extract_video_url_from_dict(self, urls: Dict[str, str]) -> Optional[str]:
-        """从URL字典中提取视频URL
+    def _build_video_variant(
+        self,
+        url: str,
+        label: str = '',
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        bitrate: Optional[int] = None,
+        size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """构建视频版本字典，缺失的清晰度和分辨率从URL的 label/template 参数中补全
+
+        例如 ...mp4?label=mp4_720p&template=720x1280.24.0 -> label=mp4_720p, 720x1280
+
+        Args:
+            url: 视频URL
+            label: 清晰度标识
+            width: 宽度
+            height: 高度
+            bitrate: 码率（bps）
+            size: 文件大小（字节）
+
+        Returns:
+            视频版本字典，包含 label, url, width, height, bitrate, size
+        """
+        url = self._normalize_url(url)
+        params = parse_qs(urlparse(url).query)
+        if not label:
+            label = params.get('label', [''])[0]
+        if not (width and height):
+            match = re.match(r'(\d+)x(\d+)', params.get('template', [''])[0])
+            if match:
+                width, height = int(match.group(1)), int(match.group(2))
+        return {
+            'label': label,
+            'url': url,
+            'width': int(width) if width else None,
+            'height': int(height) if height else None,
+            'bitrate': int(bitrate) if bitrate else None,
+            'size': int(size) if size else None,
+        }
+
+    def _sort_video_variants(self, variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按URL去重并按画质从高到低排序（分辨率未知的版本保持原有顺序排在最后）
+
+        Args:
+            variants: 视频版本列表
+
+        Returns:
+            排序后的视频版本列表
+        """
+        unique = {}
+        for variant in variants:
+            if variant['url'] not in unique:
+                unique[variant['url']] = variant
+        return sorted(
+            unique.values(),
+            key=lambda v: (
+                MediaPolicy.video_resolution(v) or 0,
+                v['bitrate'] or 0,
+                v['size'] or 0,
+            ),
+            reverse=True
+        )
+
+    def _extract_video_variants_from_dict(self, urls: Dict[str, str]) -> List[Dict[str, Any]]:
+        """从URL字典中提取视频版本列表
         
         Args:
             urls: URL字典，键为清晰度标识，值为URL
             
         Returns:
-            视频URL，如果不存在则返回None
+            视频版本列表
         """
         if not urls or not isinstance(urls, dict):
-            return None
-        video_url = list(urls.values())[0]
-        return self._normalize_url(video_url) if video_url else None
+            return []
+        return [
+            self._build_video_variant(video_url, label=label)
+            for label, video_url in urls.items() if video_url
+        ]
 
-    def _extract_video_url_from_media_info(self, media_info: Dict[str, Any]) -> Optional[str]:
-        """从media_info中提取视频URL
+    def _extract_video_variants_from_media_info(self, media_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从media_info中提取视频版本列表
+        
+        优先使用 playback_list 中带码率和大小的播放信息，其次使用各清晰度的URL字段
         
         Args:
             media_info: 媒体信息字典
             
         Returns:
-            视频URL，优先返回高清URL，如果不存在则返回普通URL
+            视频版本列表
         """
         if not media_info:
-            return None
-        hd_url = media_info.get('hd_url') or media_info.get('stream_url_hd')
-        if hd_url:
-            return hd_url
-        stream_url = media_info.get('stream_url')
-        return stream_url if stream_url else None
+            return []
+        variants = []
+        for playback in media_info.get('playback_list') or []:
+            play_info = playback.get('play_info') or {}
+            if play_info.get('url'):
+                variants.append(self._build_video_variant(
+                    play_info['url'],
+                    label=play_info.get('quality_label') or play_info.get('label', ''),
+                    width=play_info.get('width'),
+                    height=play_info.get('height'),
+                    bitrate=play_info.get('bitrate'),
+                    size=play_info.get('size'),
+                ))
+        for key in self.MEDIA_INFO_VIDEO_KEYS:
+            if media_info.get(key):
+                variants.append(self._build_video_variant(media_info[key]))
+        return variants
+
+    def _extract_video_variants_from_details(self, video_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从 video_info.video_details 中提取视频版本列表
+        
+        Args:
+            video_details: 以清晰度为键的视频详情字典
+            
+        Returns:
+            视频版本列表
+        """
+        variants = []
+        for quality, detail in video_details.items():
+            if isinstance(detail, dict) and detail.get('url'):
+                variants.append(self._build_video_variant(
+                    detail['url'],
+                    label=detail.get('label') or str(quality),
+                    width=detail.get('width'),
+                    height=detail.get('height') or (int(quality) if str(quality).isdigit() else None),
+                    bitrate=detail.get('bitrate'),
+                    size=detail.get('size'),
+                ))
+        return variants
+
+    def _build_video_item(self, variants: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """构建视频媒体项
+
+        Args:
+            variants: 视频版本列表
+
+        Returns:
+            视频媒体项 {'type': 'video', 'variants': [...]}，没有可用版本时返回None
+        """
+        variants = self._sort_video_variants(variants)
+        return {'type': 'video', 'variants': variants} if variants else None
+
+    def _select_media(
+        self,
+        items: List[Dict[str, Any]],
+        policy: Optional[MediaPolicy] = None
+    ) -> Tuple[List[str], Optional[int]]:
+        """按选择策略将媒体项转换为直链列表
+
+        Args:
+            items: 媒体项列表
+            policy: 媒体选择策略，默认选择最高画质
+
+        Returns:
+            (媒体直链列表, 第一个视频所选版本的大小（未知时为None）)
+        """
+        policy = policy or MediaPolicy()
+        media_urls = []
+        video_size = None
+        first_video = True
+        for item in items:
+            if item['type'] == 'video':
+                variant = policy.select_video(item['variants'])
+                media_urls.append(variant['url'])
+                if first_video:
+                    video_size = variant['size']
+                    first_video = False
+            else:
+                media_urls.append(policy.select_image(item['renditions'])['url'])
+        return media_urls, video_size
+
+    def _collect_video_variants(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """收集每个视频的全部清晰度版本
+
+        Args:
+            items: 媒体项列表
+
+        Returns:
+            视频版本列表的列表，顺序与 media_urls 中的视频一致
+        """
+        return [item['variants'] for item in items if item['type'] == 'video']
+
+    def _collect_image_renditions(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """收集每张图片的全部尺寸
+
+        Args:
+            items: 媒体项列表
 
-    def _extract_pic_url(self, pic_data: Dict[str, Any]) -> Optional[str]:
-        """从图片数据中提取URL，按优先级顺序尝试
+        Returns:
+            图片尺寸列表的列表，顺序与 media_urls 中的图片一致
+        """
+        return [item['renditions'] for item in items if item['type'] == 'image']
+
+    def _extract_pic_renditions(self, pic_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从图片数据中提取全部尺寸
         
         Args:
-            pic_data: 图片数据字典，可能包含 largest, original, large 等字段
+            pic_data: 图片数据字典，可能包含 thumbnail, bmiddle, large, original, largest 等字段；
+                m.weibo.cn 的默认尺寸（url 字段，orj360）视为 bmiddle
             
         Returns:
-            图片URL，如果不存在则返回None
+            图片尺寸列表，每项包含 name, url, width, height（未知时为None）
         """
-        # 优先级：largest > original > large > url
-        for key in ['largest', 'original', 'large']:
-            size_info = pic_data.get(key, {})
-            if isinstance(size_info, dict):
-                url = size_info.get('url')
-                if url:
-                    return url
-        return pic_data.get('url')
+        renditions = []
+        for name, size_info in pic_data.items():
+            if not isinstance(size_info, dict) or not size_info.get('url'):
+                continue
+            geo = size_info.get('geo') or size_info
+            width, height = geo.get('width'), geo.get('height')
+            renditions.append({
+                'name': name,
+                'url': size_info['url'],
+                'width': int(width) if width else None,
+                'height': int(height) if height else None,
+            })
+        names = {rendition['name'] for rendition in renditions}
+        if pic_data.get('url') and 'bmiddle' not in names:
+            geo = pic_data.get('geo') or {}
+            width, height = geo.get('width'), geo.get('height')
+            renditions.append({
+                'name': 'bmiddle',
+                'url': pic_data['url'],
+                'width': int(width) if width else None,
+                'height': int(height) if height else None,
+            })
+        return renditions
+
+    def _build_image_item(self, pic_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """构建图片媒体项
+
+        Args:
+            pic_data: 图片数据字典
+
+        Returns:
+            图片媒体项 {'type': 'image', 'renditions': [...]}，没有可用尺寸时返回None
+        """
+        renditions = self._extract_pic_renditions(pic_data)
+        return {'type': 'image', 'renditions': renditions} if renditions else None
+
+    def _resolve_fields(self, fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+        """校验并规范化调用方需要的结果字段
+
+        Args:
+            fields: 需要的字段，None 表示全部字段
+
+        Returns:
+            字段集合（始终包含 url 和 media_urls）
+
+        Raises:
+            ValueError: 包含未知字段
+        """
+        if fields is None:
+            return frozenset(self.RESULT_FIELDS)
+        fields = frozenset(fields)
+        unknown = fields - set(self.RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"未知的结果字段: {', '.join(sorted(unknown))}")
+        return fields | {'url', 'media_urls'}
 
     def _build_result_dict(
         self,
@@ -304,7 +1030,12 @@ class WeiboParser(BaseVideoParser):
         author: str,
         desc: str,
         timestamp: str,
-        media_urls: List[str]
+        media_urls: List[str],
+        fields: FrozenSet[str] = frozenset(RESULT_FIELDS),
+        video_variants: Optional[List[List[Dict[str, Any]]]] = None,
+        video_size: Optional[int] = None,
+        image_renditions: Optional[List[List[Dict[str, Any]]]] = None,
+        retweeted: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """构建解析结果字典
         
@@ -315,45 +1046,107 @@ class WeiboParser(BaseVideoParser):
             desc: 描述
             timestamp: 时间戳
             media_urls: 媒体URL列表
+            fields: 需要返回的字段
+            video_variants: 每个视频的全部清晰度版本
+            video_size: 所选视频版本的大小
+            image_renditions: 每张图片的全部尺寸
+            retweeted: 被转发微博的信息
             
         Returns:
             解析结果字典
         """
-        return {
+        result = {
             'url': url,
             'media_type': media_type,
             'title': '',
             'author': author,
             'desc': desc,
             'timestamp': timestamp,
-            'video_size': None,
+            'video_size': video_size,
             'media_urls': media_urls,
+            'video_variants': video_variants or [],
+            'image_renditions': image_renditions or [],
+            'retweeted': retweeted,
         }
+        return {key: value for key, value in result.items() if key in fields}
 
-    async def _parse_weibo_com(
+    def _build_status_result(
         self,
-        session: aiohttp.ClientSession,
         url: str,
-        cookies: str
+        status: Dict[str, Any],
+        pic_num: int,
+        media_items: List[Dict[str, Any]],
+        policy: Optional[MediaPolicy],
+        fields: FrozenSet[str]
     ) -> Dict[str, Any]:
-        """解析 weibo.com 链接
-        
+        """根据微博状态数据构建解析结果，未请求的字段不做处理
+
         Args:
-            session: aiohttp 会话
-            url: 微博链接
-            cookies: cookie 字符串
-            
+            url: 原始URL
+            status: 微博状态数据（weibo.com 的 json_data 或 m.weibo.cn 的 status）
+            pic_num: 图片数量
+            media_items: 媒体项列表
+            policy: 媒体选择策略
+            fields: 需要返回的字段
+
         Returns:
             解析结果字典
-            
-        Raises:
-            Exception: 解析失败
         """
-        page_id = self._extract_page_id(url)
-        
-        # 根据抓包结果，短ID和数字ID都使用id参数，并添加locale和isGetLongText参数
-        api_url = f"https://weibo.com/ajax/statuses/show?id={page_id}&locale=zh-CN&isGetLongText=true"
-        
+        media_urls, video_size = self._select_media(media_items, policy)
+        video_variants = self._collect_video_variants(media_items)
+        media_type = author = clean_text = formatted_timestamp = ''
+
+        if 'media_type' in fields:
+            media_type = self._determine_media_type(pic_num, media_urls)
+
+        if 'timestamp' in fields:
+            formatted_timestamp = self._format_timestamp(status.get('created_at', ''))
+
+        if 'desc' in fields:
+            raw_text = status.get('text_raw', '') or status.get('text', '')
+            clean_text = self._clean_html_text(raw_text)
+
+        if 'author' in fields:
+            user = status.get('user') or {}
+            author = self._format_author(user.get('screen_name', ''), user.get('id', ''))
+
+        retweeted = None
+        if 'retweeted' in fields and status.get('retweeted_status'):
+            retweeted = self._build_retweeted_info(status['retweeted_status'])
+
+        return self._build_result_dict(
+            url, media_type, author, clean_text, formatted_timestamp, media_urls, fields,
+            video_variants, video_size, self._collect_image_renditions(media_items), retweeted
+        )
+
+    def _build_retweeted_info(self, retweeted_status: Dict[str, Any]) -> Dict[str, Any]:
+        """构建被转发微博的信息
+
+        Args:
+            retweeted_status: 转发微博中内嵌的原微博数据
+
+        Returns:
+            原微博信息，包含 post_id, url, author（原微博已删除时作者为空）
+        """
+        user = retweeted_status.get('user') or {}
+        post_id = str(retweeted_status.get('idstr') or retweeted_status.get('id') or '')
+        user_id = user.get('id', '')
+        return {
+            'post_id': post_id,
+            'url': f"https://weibo.com/{user_id}/{post_id}" if user_id and post_id else '',
+            'author': self._format_author(user.get('screen_name', ''), user_id),
+        }
+
+    def _build_ajax_headers(self, referer: str, cookies: str) -> Dict[str, str]:
+        """构建 weibo.com ajax 接口的请求头
+
+        Args:
+            referer: 作为referer的页面URL
+            cookies: cookie 字符串
+
+        Returns:
+            请求头字典（cookie中存在XSRF-TOKEN时附带 x-xsrf-token）
+        """
         # 从cookie中提取XSRF-TOKEN（如果存在）
         xsrf_token = None
         for cookie_item in cookies.split('; '):
@@ -363,7 +1156,7 @@ class WeiboParser(BaseVideoParser):
         
         headers = {
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36 Edg/142.0.0.0',
-            'referer': url,
+            'referer': referer,
             'cookie': cookies,
             'accept': 'application/json, text/plain, */*',
             'x-requested-with': 'XMLHttpRequest',
@@ -376,51 +1169,88 @@ class WeiboParser(BaseVideoParser):
         # 如果存在XSRF-TOKEN，添加到请求头
         if xsrf_token:
             headers['x-xsrf-token'] = xsrf_token
+        return headers
 
-        async with session.get(api_url, headers=headers) as response:
-            if response.status == 200:
-                json_data = await response.json()
-                
-                # 检查API是否返回错误
-                if json_data.get('ok') == 0:
-                    error_msg = json_data.get('msg', '未知错误')
-                    raise Exception(f"获取微博数据失败: {error_msg}")
-                
-                # 检查返回数据的结构，可能数据在data字段中
-                if 'data' in json_data and isinstance(json_data['data'], dict):
-                    json_data = json_data['data']
-                
-                media_urls = self._extract_media_urls(json_data)
-                
-                if not media_urls:
-                    raise Exception("未找到媒体文件")
-                
-                user = json_data.get('user', {})
-                pic_num = json_data.get('pic_num', 0)
-                media_type = self._determine_media_type(pic_num, media_urls)
-                
-                created_at = json_data.get('created_at', '')
-                formatted_timestamp = self._format_timestamp(created_at)
-                
-                raw_text = json_data.get('text_raw', '') or json_data.get('text', '')
-                clean_text = self._clean_html_text(raw_text)
-                
-                screen_name = user.get('screen_name', '')
-                user_id = user.get('id', '')
-                author = self._format_author(screen_name, user_id)
-                
-                return self._build_result_dict(
-                    url, media_type, author, clean_text, formatted_timestamp, media_urls
-                )
-            else:
-                text = await response.text()
-                raise Exception(f"获取微博数据失败，状态码: {response.status}, 响应: {text}")
+    async def _parse_weibo_com(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        cookies: str,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy] = None,
+        priority: int = PRIORITY_BACKFILL
+    ) -> Dict[str, Any]:
+        """解析 weibo.com 链接
+        
+        Args:
+            session: aiohttp 会话
+            url: 微博链接
+            cookies: cookie 字符串
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            priority: 优先级
+            
+        Returns:
+            解析结果字典
+            
+        Raises:
+            WeiboError: 解析失败
+        """
+        page_id = self._extract_page_id(url)
+        
+        # 根据抓包结果，短ID和数字ID都使用id参数，并添加locale和isGetLongText参数
+        # 长文本只影响简介，不需要简介时不请求长文本，减少响应体积
+        api_url = f"https://weibo.com/ajax/statuses/show?id={page_id}&locale=zh-CN"
+        if 'desc' in fields:
+            api_url += "&isGetLongText=true"
+        
+        body = await self._request_ajax(session, api_url, url, cookies, "获取微博数据失败", priority)
+        return await self._offload(len(body), '_build_weibo_com_result', url, body, fields, policy)
+
+    def _build_weibo_com_result(
+        self,
+        url: str,
+        body: bytes,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy] = None
+    ) -> Dict[str, Any]:
+        """解码 weibo.com 微博详情接口的响应体并构建解析结果
+        
+        Args:
+            url: 微博链接
+            body: ajax/statuses/show 的响应体
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            
+        Returns:
+            解析结果字典
+            
+        Raises:
+            NotFoundError / DecodeError / NoMediaError: 接口返回错误、响应无法解析或未找到媒体文件
+        """
+        json_data = self._load_ajax_json(body, "获取微博数据失败")
+        
+        # 检查返回数据的结构，可能数据在data字段中
+        if 'data' in json_data and isinstance(json_data['data'], dict):
+            json_data = json_data['data']
+        
+        media_items = self._extract_media_items(json_data)
+        
+        if not media_items:
+            raise NoMediaError("未找到媒体文件")
+        
+        retweeted_status = json_data.get('retweeted_status') or {}
+        pic_num = json_data.get('pic_num', 0) + retweeted_status.get('pic_num', 0)
+        return self._build_status_result(url, json_data, pic_num, media_items, policy, fields)
 
     async def _parse_m_weibo_cn(
         self,
         session: aiohttp.ClientSession,
         url: str,
-        cookies: str
+        cookies: str,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy] = None,
+        priority: int = PRIORITY_BACKFILL
     ) -> Dict[str, Any]:
         """解析 m.weibo.cn 链接
         
@@ -428,12 +1258,15 @@ class WeiboParser(BaseVideoParser):
             session: aiohttp 会话
             url: m.weibo.cn 链接
             cookies: cookie 字符串
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            priority: 优先级
             
         Returns:
             解析结果字典
             
         Raises:
-            Exception: 解析失败
+            WeiboError: 解析失败
         """
         blog_id = self._extract_blog_id(url)
         detail_url = f"https://m.weibo.cn/detail/{blog_id}"
@@ -444,55 +1277,73 @@ class WeiboParser(BaseVideoParser):
             'cookie': cookies,
         }
         
-        async with session.get(detail_url, headers=headers) as response:
-            if response.status == 200:
-                html = await response.text()
-                # 从 HTML 中提取 JSON 数据
-                match = re.search(r'var \$render_data = (\[.*?\])\[0\]', html, re.DOTALL)
-                if match:
-                    json_str = match.group(1)
-                    try:
-                        json_data = json.loads(json_str)
-                        if json_data and len(json_data) > 0:
-                            status_data = json_data[0]
-                            media_urls = self._extract_media_urls_m_weibo(status_data)
-                            
-                            if not media_urls:
-                                raise Exception("未找到媒体文件")
-                            
-                            status = status_data.get('status', {})
-                            user = status.get('user', {})
-                            pic_num = len(status.get('pics', []))
-                            media_type = self._determine_media_type(pic_num, media_urls)
-                            
-                            created_at = status.get('created_at', '')
-                            formatted_timestamp = self._format_timestamp(created_at)
-                            
-                            raw_text = status.get('text_raw', '') or status.get('text', '')
-                            clean_text = self._clean_html_text(raw_text)
-                            
-                            screen_name = user.get('screen_name', '')
-                            user_id = user.get('id', '')
-                            author = self._format_author(screen_name, user_id)
-                            
-                            return self._build_result_dict(
-                                url, media_type, author, clean_text, formatted_timestamp, media_urls
-                            )
-                        else:
-                            raise Exception("JSON 数据为空")
-                    except json.JSONDecodeError as e:
-                        raise Exception(f"解析 JSON 失败: {str(e)}")
+        async with self.breakers['mobile'].request():
+            async with stage_context('queue', self.limiter.request(priority, 'mobile')) as call:
+                async with stage_context('request', session.get(detail_url, headers=headers)) as response:
+                    call.status = response.status
+                    self.visitor_pool.report(cookies, response.status)
+                    if response.status != 200:
+                        text = await run_stage('body', response.text())
+                        raise error_for_status(
+                            response.status, f"获取微博数据失败，状态码: {response.status}, 响应: {text[:200]}"
+                        )
+                    html = await run_stage('body', response.text())
+        
+        return await self._offload(len(html), '_build_m_weibo_cn_result', url, html, fields, policy)
+
+    def _build_m_weibo_cn_result(
+        self,
+        url: str,
+        html: str,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy] = None
+    ) -> Dict[str, Any]:
+        """从 m.weibo.cn 详情页中提取 $render_data 并构建解析结果
+        
+        Args:
+            url: m.weibo.cn 链接
+            html: 详情页 HTML
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            
+        Returns:
+            解析结果字典
+            
+        Raises:
+            DecodeError / NoMediaError: 解析失败
+        """
+        # 从 HTML 中提取 JSON 数据
+        match = re.search(r'var \$render_data = (\[.*?\])\[0\]', html, re.DOTALL)
+        if match:
+            json_str = match.group(1)
+            try:
+                json_data = json.loads(json_str)
+                if json_data and len(json_data) > 0:
+                    status_data = json_data[0]
+                    media_items = self._extract_media_items_m_weibo(status_data)
+                    
+                    if not media_items:
+                        raise NoMediaError("未找到媒体文件")
+                    
+                    status = status_data.get('status', {})
+                    retweeted_status = status.get('retweeted_status') or {}
+                    pic_num = len(status.get('pics') or []) + len(retweeted_status.get('pics') or [])
+                    return self._build_status_result(url, status, pic_num, media_items, policy, fields)
                 else:
-                    raise Exception("未找到 $render_data 数据")
-            else:
-                text = await response.text()
-                raise Exception(f"获取微博数据失败，状态码: {response.status}, 响应: {text[:200]}")
+                    raise DecodeError("JSON 数据为空")
+            except json.JSONDecodeError as e:
+                raise DecodeError(f"解析 JSON 失败: {str(e)}")
+        else:
+            raise DecodeError("未找到 $render_data 数据")
 
     async def _parse_video_weibo(
         self,
         session: aiohttp.ClientSession,
         url: str,
-        cookies: str
+        cookies: str,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy] = None,
+        priority: int = PRIORITY_BACKFILL
     ) -> Dict[str, Any]:
         """解析 video.weibo.com 链接
         
@@ -500,12 +1351,15 @@ class WeiboParser(BaseVideoParser):
             session: aiohttp 会话
             url: 视频链接
             cookies: cookie 字符串
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            priority: 优先级
             
         Returns:
             解析结果字典
             
         Raises:
-            Exception: 解析失败
+            WeiboError: 解析失败
         """
         video_id = self._extract_video_id(url)
         referer_url = f"https://weibo.com/tv/show/{video_id}?from=old_pc_videoshow"
@@ -522,37 +1376,50 @@ class WeiboParser(BaseVideoParser):
             'data': json.dumps({"Component_Play_Playinfo": {"oid": video_id}})
         }
         
-        async with session.post(api_url, headers=headers, data=payload) as response:
-            if response.status == 200:
-                json_data = await response.json()
-                media_urls = self._extract_media_urls_video(json_data)
-                
-                if not media_urls:
-                    raise Exception("未找到视频文件")
-                
-                playinfo = json_data.get('data', {}).get('Component_Play_Playinfo', {})
-                desc = playinfo.get('title', '') or playinfo.get('content1', '')
-                screen_name = playinfo.get('author', '') or playinfo.get('author_name', '')
-                user_id = playinfo.get('author_id', '') or playinfo.get('user', {}).get('id', '')
-                author = self._format_author(screen_name, user_id)
-                
-                return self._build_result_dict(
-                    url, 'video', author, desc, '', media_urls
-                )
-            else:
-                text = await response.text()
-                raise Exception(f"获取视频数据失败，状态码: {response.status}, 响应: {text}")
+        async with self.breakers['tv'].request():
+            async with stage_context('queue', self.limiter.request(priority, 'tv')) as call:
+                async with stage_context('request', session.post(api_url, headers=headers, data=payload)) as response:
+                    call.status = response.status
+                    self.visitor_pool.report(cookies, response.status)
+                    if response.status == 200:
+                        try:
+                            json_data = await run_stage('body', response.json())
+                        except (ValueError, aiohttp.ContentTypeError) as e:
+                            raise DecodeError(f"解析视频数据失败: {str(e)}")
+                        media_items = self._extract_media_items_video(json_data)
+                        
+                        if not media_items:
+                            raise NoMediaError("未找到视频文件")
+                        
+                        media_urls, video_size = self._select_media(media_items, policy)
+                        
+                        playinfo = json_data.get('data', {}).get('Component_Play_Playinfo', {})
+                        desc = playinfo.get('title', '') or playinfo.get('content1', '')
+                        screen_name = playinfo.get('author', '') or playinfo.get('author_name', '')
+                        user_id = playinfo.get('author_id', '') or playinfo.get('user', {}).get('id', '')
+                        author = self._format_author(screen_name, user_id)
+                        
+                        return self._build_result_dict(
+                            url, 'video', author, desc, '', media_urls, fields,
+                            self._collect_video_variants(media_items), video_size
+                        )
+                    else:
+                        text = await run_stage('body', response.text())
+                        raise error_for_status(
+                            response.status, f"获取视频数据失败，状态码: {response.status}, 响应: {text}"
+                        )
 
-    def _extract_media_urls(self, json_data: Dict[str, Any]) -> List[str]:
-        """从 JSON 数据中提取所有媒体链接（图片和视频）
+    def _extract_media_items(self, json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从 JSON 数据中提取所有媒体项（图片和视频）
         
         Args:
             json_data: 微博 JSON 数据
             
         Returns:
-            媒体链接列表
+            媒体项列表，图片为 {'type': 'image', 'renditions': [...]}（包含全部尺寸），
+            视频为 {'type': 'video', 'variants': [...]}（包含全部清晰度版本）
         """
-        media_urls = []
+        media_items = []
         
         # 方法1: 提取mix_media_info中的媒体（新格式，包含图片和视频）
         mix_media_info = json_data.get('mix_media_info', {})
@@ -563,15 +1430,15 @@ class WeiboParser(BaseVideoParser):
                 data = item.get('data', {})
                 
                 if item_type == 'pic':
-                    pic_url = self._extract_pic_url(data)
-                    if pic_url:
-                        media_urls.append(pic_url)
+                    image_item = self._build_image_item(data)
+                    if image_item:
+                        media_items.append(image_item)
                 
                 elif item_type == 'video':
                     media_info = data.get('media_info', {})
-                    video_url = self._extract_video_url_from_media_info(media_info)
-                    if video_url:
-                        media_urls.append(video_url)
+                    video_item = self._build_video_item(self._extract_video_variants_from_media_info(media_info))
+                    if video_item:
+                        media_items.append(video_item)
         
         # 方法2: 提取图片链接（pic_infos格式 - weibo.com标准格式）
         pic_infos = json_data.get('pic_infos', {})
@@ -583,99 +1450,105 @@ class WeiboParser(BaseVideoParser):
                 if pic_type == 'gif' and pic_info.get('video'):
                     video_url = pic_info.get('video', '')
                     if video_url:
-                        media_urls.append(video_url)
+                        media_items.append(self._build_video_item([self._build_video_variant(video_url)]))
                         continue
                 
-                # 对于普通图片，获取最高画质的图片链接
-                pic_url = self._extract_pic_url(pic_info)
-                if pic_url:
-                    media_urls.append(pic_url)
+                # 对于普通图片，收集全部尺寸，由选择策略决定使用哪个
+                image_item = self._build_image_item(pic_info)
+                if image_item:
+                    media_items.append(image_item)
         
         # 方法3: 提取图片链接（pics数组格式 - 某些API返回格式）
         pics = json_data.get('pics', [])
         if pics:
             for pic in pics:
-                pic_url = self._extract_pic_url(pic)
-                if pic_url:
-                    media_urls.append(pic_url)
+                image_item = self._build_image_item(pic)
+                if image_item:
+                    media_items.append(image_item)
         
-        # 方法4: 提取视频链接（page_info 中的视频）
+        # 方法4: 提取视频链接（page_info 中的视频，urls 和 media_info 是同一个视频的不同版本）
         page_info = json_data.get('page_info', {})
         if page_info:
-            urls = page_info.get('urls', {})
-            video_url = self._extract_video_url_from_dict(urls)
-            if video_url:
-                media_urls.append(video_url)
-            
-            media_info = page_info.get('media_info', {})
-            video_url = self._extract_video_url_from_media_info(media_info)
-            if video_url:
-                media_urls.append(video_url)
+            variants = self._extract_video_variants_from_dict(page_info.get('urls', {}))
+            variants += self._extract_video_variants_from_media_info(page_info.get('media_info', {}))
+            video_item = self._build_video_item(variants)
+            if video_item:
+                media_items.append(video_item)
         
         # 方法5: 检查是否有其他视频格式
         video_info = json_data.get('video_info', {})
         if video_info:
-            video_url = video_info.get('video_details', {}).get('video_details', {})
-            if video_url:
-                # 尝试获取最高画质
-                max_quality = max(video_url.keys(), key=lambda x: int(x) if x.isdigit() else 0, default=None)
-                if max_quality:
-                    url = video_url[max_quality].get('url', '')
-                    if url:
-                        media_urls.append(url)
+            video_details = video_info.get('video_details', {}).get('video_details', {})
+            if video_details:
+                video_item = self._build_video_item(self._extract_video_variants_from_details(video_details))
+                if video_item:
+                    media_items.append(video_item)
         
-        return media_urls
+        # 方法6: 转发微博的媒体位于内嵌的 retweeted_status 中，无需再请求原微博
+        retweeted_status = json_data.get('retweeted_status')
+        if retweeted_status:
+            media_items.extend(self._extract_media_items(retweeted_status))
+        
+        return media_items
 
-    def _extract_media_urls_m_weibo(self, json_data: Dict[str, Any]) -> List[str]:
-        """从 m.weibo.cn JSON 数据中提取所有媒体链接
+    def _extract_media_items_m_weibo(self, json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从 m.weibo.cn JSON 数据中提取所有媒体项
         
         Args:
             json_data: m.weibo.cn JSON 数据
             
         Returns:
-            媒体链接列表
+            媒体项列表
         """
-        media_urls = []
+        media_items = []
         status = json_data.get('status', {})
         
         # 提取图片链接
         pics = status.get('pics', [])
         if pics:
             for pic in pics:
-                pic_url = self._extract_pic_url(pic)
-                if pic_url:
-                    media_urls.append(pic_url)
+                image_item = self._build_image_item(pic)
+                if image_item:
+                    media_items.append(image_item)
         
         # 提取视频链接
         page_info = status.get('page_info', {})
         if page_info and page_info.get('type') == 'video':
-            urls = page_info.get('urls', {})
-            video_url = self._extract_video_url_from_dict(urls)
-            if video_url:
-                media_urls.append(video_url)
+            variants = self._extract_video_variants_from_dict(page_info.get('urls', {}))
+            variants += self._extract_video_variants_from_media_info(page_info.get('media_info', {}))
+            video_item = self._build_video_item(variants)
+            if video_item:
+                media_items.append(video_item)
         
-        return media_urls
+        # 提取转发微博中原微博的媒体
+        retweeted_status = status.get('retweeted_status')
+        if retweeted_status:
+            media_items.extend(self._extract_media_items_m_weibo({'status': retweeted_status}))
+        
+        return media_items
 
-    def _extract_media_urls_video(self, json_data: Dict[str, Any]) -> List[str]:
-        """从 video.weibo.com JSON 数据中提取视频链接
+    def _extract_media_items_video(self, json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从 video.weibo.com JSON 数据中提取视频媒体项
         
         Args:
             json_data: video.weibo.com JSON 数据
             
         Returns:
-            视频链接列表
+            媒体项列表
         """
-        media_urls = []
+        media_items = []
         try:
             playinfo = json_data.get('data', {}).get('Component_Play_Playinfo', {})
-            urls = playinfo.get('urls', {})
-            video_url = self._extract_video_url_from_dict(urls)
-            if video_url:
-                media_urls.append(video_url)
+            variants = self._extract_video_variants_from_dict(playinfo.get('urls', {}))
+            if playinfo.get('stream_url'):
+                variants.append(self._build_video_variant(playinfo['stream_url']))
+            video_item = self._build_video_item(variants)
+            if video_item:
+                media_items.append(video_item)
         except Exception:
             pass
         
-        return media_urls
+        return media_items
 
     def _clean_html_text(self, html_text: str) -> str:
         """清理HTML标签，提取纯文本
@@ -747,41 +1620,334 @@ class WeiboParser(BaseVideoParser):
     async def parse(
         self,
         session: aiohttp.ClientSession,
-        url: str
+        url: str,
+        fields: Optional[Iterable[str]] = None,
+        policy: Optional[MediaPolicy] = None,
+        priority: int = PRIORITY_BACKFILL,
+        timeout: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
         """解析单个微博链接
         
         Args:
             session: aiohttp 会话
-            url: 微博链接
+            url: 微博链接，t.cn 短链接和分享页链接先跟随跳转解析为微博链接（结果有缓存）
+            fields: 需要返回的字段子集（取自 RESULT_FIELDS），默认返回全部字段；
+                未请求的字段不做文本清理、时间格式化等处理，url 和 media_urls 始终返回，
+                例如只需要直链时传入 fields=['media_urls']
+            policy: 媒体选择策略，决定 media_urls 中填入的视频版本和图片尺寸，
+                例如 MediaPolicy(max_height=720) 最高选择 720P，
+                MediaPolicy(image_size='thumbnail') 使用缩略图，默认选择最高画质
+            priority: 优先级，用户直接发起的解析传入 PRIORITY_INTERACTIVE，
+                上游并发额度优先分配给交互请求并为其预留一部分，各优先级的耗时见 limiter.stats()['lanes']
+            timeout: 整个调用的时间预算（秒），依次分配给短链接解析、排队、访客cookie获取、XSRF-TOKEN获取、
+                上游请求和响应体读取，预算耗尽时取消当前阶段；None 表示不限时
             
         Returns:
-            解析结果字典，只包含以下字段：
+            解析结果字典，只包含以下字段（指定 fields 时只包含其中请求的字段）：
             - url: 原始url
             - media_type: 媒体类型 ("video", "image", "gallery")
             - title: 标题
             - author: 作者
             - desc: 简介
             - timestamp: 上传时间（Y-M-D格式）
-            - video_size: 视频大小（默认为None，本项目不实现）
+            - video_size: 所选视频版本的大小（字节，接口未提供时为None）
             - media_urls: 媒体直链列表
+            - video_variants: 每个视频的全部清晰度版本列表，版本包含
+              label, url, width, height, bitrate, size（未知时为None），按画质从高到低排序
+            - image_renditions: 每张图片的全部尺寸列表，尺寸包含 name, url, width, height
+            - retweeted: 转发微博时为原微博信息（post_id, url, author），否则为None；
+              原微博的媒体已包含在 media_urls 中
             
         Raises:
-            Exception: 解析失败时抛出异常
+            StageTimeoutError: 超过时间预算，stage 属性为超时的阶段
+            WeiboError: 解析失败，具体类型见 weibo_errors（连接失败或超时为 NetworkError）；
+                临时性失败已按 retry_policy 重试
+            ValueError: 无法识别的URL，或短链接没有指向微博
         """
-        # 步骤 1: 判断URL类型
-        url_type = self._get_url_type(url)
+        fields = self._resolve_fields(fields)
+        if not self.is_short_link(url):
+            # 无法识别的URL在发出任何请求之前报错
+            self._get_url_type(url)
         
-        # 步骤 2: 获取cookie
-        cookies = await self._get_visitor_cookies(session)
+        with deadline_scope(timeout):
+            # 步骤 1: 解析短链接，判断URL类型
+            post_url = await self.resolve_url(session, url)
+            url_type = self._get_url_type(post_url)
+            
+            result = await self.retry_policy.call(
+                self._parse_once, session, post_url, url_type, fields, policy, priority
+            )
+        # 结果中的 url 保持为调用方传入的链接
+        return result if post_url == url else dict(result, url=url)
+
+    async def _parse_once(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        url_type: str,
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy],
+        priority: int
+    ) -> Dict[str, Any]:
+        """解析单个微博链接（一次尝试）
+        
+        Args:
+            session: aiohttp 会话
+            url: 微博链接
+            url_type: URL类型
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+            priority: 优先级
+            
+        Returns:
+            解析结果字典
+            
+        Raises:
+            WeiboError: 解析失败
+        """
+        # 步骤 2: 获取cookie（每次尝试重新选择访客身份，被限流的身份不会再被优先选中）
+        cookies = await run_stage('cookie', self._get_visitor_cookies(session, priority))
         
         # 步骤 3: 根据URL类型选择对应的解析方法
-        if url_type == 'weibo_com':
-            return await self._parse_weibo_com(session, url, cookies)
-        elif url_type == 'm_weibo_cn':
-            return await self._parse_m_weibo_cn(session, url, cookies)
-        elif url_type == 'video_weibo':
-            return await self._parse_video_weibo(session, url, cookies)
+        with wrap_network_errors("获取微博数据失败"):
+            if url_type == 'weibo_com':
+                return await self._parse_weibo_com(session, url, cookies, fields, policy, priority)
+            elif url_type == 'm_weibo_cn':
+                return await self._parse_m_weibo_cn(session, url, cookies, fields, policy, priority)
+            elif url_type == 'video_weibo':
+                return await self._parse_video_weibo(session, url, cookies, fields, policy, priority)
+            else:
+                raise ValueError(f"不支持的URL类型: {url_type}")
+
+    async def _fetch_timeline_page(
+        self,
+        session: aiohttp.ClientSession,
+        uid: str,
+        page: int,
+        cookies: str
+    ) -> List[Dict[str, Any]]:
+        """获取用户时间线的一页微博
+
+        Args:
+            session: aiohttp 会话
+            uid: 用户ID
+            page: 页码（从1开始）
+            cookies: cookie 字符串
+
+        Returns:
+            该页的微博状态列表，没有更多微博时返回空列表
+
+        Raises:
+            WeiboError: 获取失败
+        """
+        api_url = f"https://weibo.com/ajax/statuses/mymblog?uid={uid}&page={page}&feature=0"
+        error_prefix = "获取用户时间线失败"
+        with wrap_network_errors(error_prefix):
+            body = await self._request_ajax(session, api_url, f"https://weibo.com/u/{uid}", cookies, error_prefix)
+        json_data = await self._offload(len(body), '_load_ajax_json', body, error_prefix)
+        return (json_data.get('data') or {}).get('list') or []
+
+    def _build_timeline_result(
+        self,
+        uid: str,
+        status: Dict[str, Any],
+        fields: FrozenSet[str],
+        policy: Optional[MediaPolicy]
+    ) -> Optional[Dict[str, Any]]:
+        """将时间线中的一条微博转换为解析结果
+
+        Args:
+            uid: 用户ID
+            status: 微博状态数据
+            fields: 需要返回的字段
+            policy: 媒体选择策略
+
+        Returns:
+            解析结果字典，微博不包含媒体时返回None
+        """
+        media_items = self._extract_media_items(status)
+        if not media_items:
+            return None
+        post_id = status.get('mblogid') or status.get('idstr') or status.get('id')
+        url = f"https://weibo.com/{uid}/{post_id}"
+        retweeted_status = status.get('retweeted_status') or {}
+        pic_num = status.get('pic_num', 0) + retweeted_status.get('pic_num', 0)
+        return self._build_status_result(url, status, pic_num, media_items, policy, fields)
+
+    async def iter_user_timeline(
+        self,
+        session: aiohttp.ClientSession,
+        uid: str,
+        max_pages: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        policy: Optional[MediaPolicy] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """逐页抓取用户时间线，异步产出每条含媒体微博的解析结果
+
+        时间线接口返回的微博数据已包含媒体信息，直接复用提取逻辑，不会逐条再请求；
+        只有消费者取完当前页的结果后才会请求下一页，消费速度即抓取速度。
+        时间线中的长微博只包含截断后的正文。
+
+        Args:
+            session: aiohttp 会话
+            uid: 用户ID
+            max_pages: 最多抓取的页数，默认抓取到时间线末尾
+            fields: 需要返回的字段子集，同 parse()
+            policy: 媒体选择策略，同 parse()
+
+        Yields:
+            与 parse() 相同结构的解析结果字典，url 为该微博的 weibo.com 链接
+
+        Raises:
+            WeiboError: 获取失败时抛出异常
+        """
+        fields = self._resolve_fields(fields)
+        async for status in self._iter_timeline_statuses(session, uid, max_pages):
+            result = self._build_timeline_result(uid, status, fields, policy)
+            if result:
+                yield result
+
+    async def sync_user_timeline(
+        self,
+        session: aiohttp.ClientSession,
+        uid: str,
+        store: TimelineCheckpointStore,
+        max_pages: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        policy: Optional[MediaPolicy] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """增量同步用户时间线，只产出上次同步之后发布的含媒体微博
+
+        遇到不晚于检查点的微博即停止翻页；全部产出完毕后才把最新的微博ID写回检查点，
+        中途中断的同步不会推进检查点，下次会重新获取这部分微博。
+        max_pages 在翻到检查点（或时间线末尾）之前截断时不推进检查点，而是保存续传游标，
+        下次同步从停下的页继续往旧翻页（多取前一页，应对删除微博导致的前移），
+        只产出比已产出的最旧微博更早的微博；续传翻到检查点后检查点推进到截断前见到的最新微博，
+        期间新发布的微博由之后的同步获取。
+
+        Args:
+            session: aiohttp 会话
+            uid: 用户ID
+            store: 检查点存储
+            max_pages: 最多抓取的页数
+            fields: 需要返回的字段子集，同 parse()
+            policy: 媒体选择策略，同 parse()
+
+        Yields:
+            与 parse() 相同结构的解析结果字典，按时间从新到旧排列
+        """
+        fields = self._resolve_fields(fields)
+        since_id = store.get(uid)
+        cursor = store.get_cursor(uid)
+        if cursor:
+            newest_id, oldest_id = cursor['pending_id'], cursor['max_id']
+            start_page = max(1, cursor['page'] - 1)
         else:
-            raise ValueError(f"不支持的URL类型: {url_type}")
+            newest_id, oldest_id = since_id, None
+            start_page = 1
+        progress: Dict[str, Any] = {}
+        async for status in self._iter_timeline_statuses(
+            session, uid, max_pages, since_id, progress, start_page, oldest_id
+        ):
+            status_id = self._get_status_id(status)
+            if newest_id is None or status_id > newest_id:
+                newest_id = status_id
+            # 置顶微博可能很早，不作为续传位置
+            if not status.get('isTop') and (oldest_id is None or status_id < oldest_id):
+                oldest_id = status_id
+            result = self._build_timeline_result(uid, status, fields, policy)
+            if result:
+                yield result
+        if newest_id is None:
+            return
+        if progress.get('complete'):
+            if newest_id != since_id or cursor:
+                store.set(uid, newest_id)
+        elif oldest_id is not None:
+            store.set_cursor(uid, newest_id, oldest_id, progress['page'])
+
+    def _get_status_id(self, status: Dict[str, Any]) -> int:
+        """获取微博状态的数字ID
+
+        Args:
+            status: 微博状态数据
+
+        Returns:
+            数字ID，缺失时返回0
+        """
+        try:
+            return int(status.get('idstr') or status.get('id') or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    async def _iter_timeline_statuses(
+        self,
+        session: aiohttp.ClientSession,
+        uid: str,
+        max_pages: Optional[int] = None,
+        since_id: Optional[int] = None,
+        progress: Optional[Dict[str, Any]] = None,
+        start_page: int = 1,
+        max_id: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """逐页产出用户时间线中的原始微博状态
+
+        Args:
+            session: aiohttp 会话
+            uid: 用户ID
+            max_pages: 最多抓取的页数
+            since_id: 检查点，只产出ID大于它的微博，遇到不大于它的非置顶微博即停止翻页
+            progress: 可选，翻到检查点或时间线末尾时写入 complete=True，
+                被 max_pages 截断时写入 page（下一次请求的页码）
+            start_page: 起始页码
+            max_id: 续传时只产出ID小于它的非置顶微博（置顶微博已在之前的同步中产出）
+
+        Yields:
+            微博状态数据
+        """
+        cookies = await self._get_visitor_cookies(session)
+        page = start_page
+        while max_pages is None or page < start_page + max_pages:
+            statuses = await self._fetch_timeline_page(session, uid, page, cookies)
+            if not statuses:
+                if progress is not None:
+                    progress['complete'] = True
+                return
+            reached_known = False
+            for status in statuses:
+                if since_id is not None and self._get_status_id(status) <= since_id:
+                    # 置顶微博可能早于检查点，跳过但不据此停止
+                    if not status.get('isTop'):
+                        reached_known = True
+                    continue
+                if max_id is not None and (status.get('isTop') or self._get_status_id(status) >= max_id):
+                    continue
+                yield status
+            if reached_known:
+                if progress is not None:
+                    progress['complete'] = True
+                return
+            page += 1
+        if progress is not None:
+            progress['page'] = page
+
+
+# 进程池子进程中使用的解析器，按解析器类型各创建一个
+_offload_parsers: Dict[type, WeiboParser] = {}
+
+
+def _call_parser_method(parser_class: type, method: str, *args: Any) -> Any:
+    """在进程池子进程中执行解析器的纯计算方法
+
+    Args:
+        parser_class: 解析器类型（WeiboParser 或其子类）
+        method: 方法名
+        *args: 方法参数
 
+    Returns:
+        方法的返回值
+    """
+    parser = _offload_parsers.get(parser_class)
+    if parser is None:
+        parser = _offload_parsers[parser_class] = parser_class()
+    return getattr(parser, method)(*args)